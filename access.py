@@ -0,0 +1,164 @@
+import random
+import sqlite3
+import threading
+import time
+
+import httpx
+from postgrest.exceptions import APIError
+
+# ==========================================
+# [ACCESS] 백엔드 호출 정책 (시간 제한 · 재시도 · 회로 차단기)
+# ==========================================
+# 저장소 메서드 호출은 모두 call()을 거칩니다.
+# - 요청당 시간 제한은 백엔드 클라이언트에 설정하고(REQUEST_TIMEOUT), 재시도를 포함한 전체 시간은 READ_BUDGET으로 제한
+# - 조회(멱등)만 지수 백오프 + 지터로 재시도하며, 쓰기는 한 번만 시도
+# - 일시적 장애가 연속되면 회로를 열어 일정 시간 호출 없이 바로 실패 (호출 측은 마지막 스냅샷으로 대체)
+# 실패는 BackendError 하위 타입으로 전달되어, 호출 측이 조회는 완화하고 쓰기·충돌 검사는 차단하도록 구분합니다.
+
+REQUEST_TIMEOUT = 5.0   # 요청 1회의 시간 제한(초)
+READ_ATTEMPTS = 3       # 조회 최대 시도 횟수
+READ_BUDGET = 12.0      # 조회 재시도를 포함한 전체 시간 상한(초)
+BACKOFF_BASE = 0.2      # 재시도 대기 기준(초), 시도마다 2배
+BACKOFF_MAX = 2.0
+FAILURE_THRESHOLD = 5   # 회로를 여는 연속 실패 횟수
+RESET_TIMEOUT = 30.0    # 회로가 열린 뒤 시험 호출을 허용하기까지의 시간(초)
+
+# PostgreSQL SQLSTATE 중 일시적 장애로 보는 분류 (연결 예외, 자원 부족, 운영자 개입·문장 시간 초과)
+_TRANSIENT_SQLSTATES = ("08", "53", "57")
+# PostgREST가 DB 연결·스키마 캐시 문제로 반환하는 코드
+_TRANSIENT_PGRST = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+
+class BackendError(Exception):
+    """저장소 호출 실패. transient가 참이면 재시도로 회복될 수 있는 장애입니다."""
+
+    transient = True
+
+
+class BackendTimeout(BackendError):
+    """요청이 시간 제한을 넘김"""
+
+
+class BackendUnavailable(BackendError):
+    """회로가 열려 있어 호출하지 않음"""
+
+
+class BackendRejected(BackendError):
+    """백엔드가 요청 자체를 거부함 (제약 조건 위반, 잘못된 요청 등). 재시도하지 않습니다."""
+
+    transient = False
+
+
+def classify(exc: Exception) -> BackendError:
+    """저장소 예외를 BackendError 하위 타입으로 변환합니다."""
+    if isinstance(exc, BackendError):
+        return exc
+    if isinstance(exc, httpx.TimeoutException):
+        return BackendTimeout(str(exc) or "요청 시간 초과")
+    if isinstance(exc, httpx.TransportError):
+        return BackendError(str(exc) or type(exc).__name__)
+    if isinstance(exc, APIError):
+        code = str(exc.code or "")
+        if code == "57014":
+            return BackendTimeout(exc.message or "문장 시간 초과")
+        if code.startswith(_TRANSIENT_SQLSTATES) or code in _TRANSIENT_PGRST:
+            return BackendError(exc.message or code)
+        return BackendRejected(exc.message or code)
+    if isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc):
+        return BackendTimeout(str(exc))
+    if isinstance(exc, (sqlite3.IntegrityError, sqlite3.ProgrammingError, sqlite3.OperationalError)):
+        return BackendRejected(str(exc))
+    return BackendError(f"{type(exc).__name__}: {exc}")
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 회로 차단기.
+    closed → (FAILURE_THRESHOLD회 연속 일시 장애) → open → (RESET_TIMEOUT 경과) → half_open(시험 호출 1회)
+    시험 호출이 성공하면 closed로, 실패하면 다시 open으로 전환합니다.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            if self.state == "closed":
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.open_count += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """회로가 열려 있을 때 시험 호출까지 남은 시간(초)"""
+        with self.lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"state": self.state, "consecutive_failures": self.failures,
+                    "open_count": self.open_count, "rejected_calls": self.rejected}
+
+
+def backoff(attempt: int) -> float:
+    """attempt번째 재시도 전 대기 시간 (full jitter)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def call(breaker: CircuitBreaker, method, *args, idempotent: bool = False):
+    """
+    회로 차단기와 재시도 정책을 적용해 저장소 메서드를 호출합니다.
+    idempotent(조회)인 경우에만 일시 장애를 READ_BUDGET 안에서 재시도하며, 실패는 BackendError로 올립니다.
+    """
+    attempts = READ_ATTEMPTS if idempotent else 1
+    deadline = time.monotonic() + READ_BUDGET
+    for attempt in range(attempts):
+        if not breaker.allow():
+            raise BackendUnavailable(f"백엔드 응답 불가 - {breaker.retry_after():.0f}초 후 재시도")
+        try:
+            result = method(*args)
+        except Exception as e:
+            error = classify(e)
+            if not error.transient:
+                breaker.record_success()  # 요청이 거부되었을 뿐 백엔드는 응답함
+                raise error from e
+            breaker.record_failure()
+            delay = backoff(attempt)
+            # 남은 시간 안에 한 번 더 시도할 수 없으면 바로 실패
+            if attempt + 1 >= attempts or time.monotonic() + delay + REQUEST_TIMEOUT > deadline:
+                raise error from e
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
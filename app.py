@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
-import calendar
 import database as db
+import perf
+from views import get_calendar_payload, render_calendar, calendar_window, month_at, CALENDAR_STATUSES, THEME_CSS
+from views import get_compat_index, availability_table, window_label, prepare_ongoing, page_count, paginate, QUEUE_PAGE_SIZE, HISTORY_PAGE_SIZE, RENTAL_COLUMN_CONFIG
+from frames import to_plain, to_records
 
 # ==========================================
 # [1] 앱 기본 설정 및 테마 시스템
@@ -16,39 +19,8 @@ st.set_page_config(
 )
 
 def inject_custom_styles(theme_mode):
-    # """테마 선택에 따라 동적 CSS를 주입하는 함수"""
-    THEMES = {
-        "light": {
-            "bg": "#FFFFFF", "text": "#000000", "cont": "#FFFFFF", "input": "#FFFFFF", "brd": "#cccccc",
-            "cal_h": "#fdfdfd", "cal_d": "#FFFFFF", "cal_e": "#fdfdfd", "brand": "#B2DFDB", "btn_t": "#FFFFFF"
-        },
-        "dark": {
-            "bg": "#252526", "text": "#E0E0E0", "cont": "#2D2D2D", "input": "#3C3C3C", "brd": "#454545",
-            "cal_h": "#333333", "cal_d": "#2D2D2D", "cal_e": "#252526", "brand": "#004246", "btn_t": "#FFFFFF"
-        }
-    }
-
-    def make_vars(base):
-        return f"""
-            --bg-color: {base['bg']}; --text-color: {base['text']}; --container-bg: {base['cont']};
-            --input-bg: {base['input']}; --border-color: {base['brd']}; --calendar-header-bg: {base['cal_h']};
-            --calendar-day-bg: {base['cal_d']}; --calendar-empty-bg: {base['cal_e']};
-            --main-brand-color: {base['brand']}; --button-text: {base['btn_t']};
-        """
-
-    dark_extra = ".rental-line { border: 1px solid rgba(255,255,255,0.2); filter: saturate(1.2) brightness(1.1); } .calendar-day.empty { background-color: var(--calendar-empty-bg) !important; }"
-
-    if theme_mode == "시스템 설정":
-        dynamic_css = f":root {{ {make_vars(THEMES['light'])} }} @media (prefers-color-scheme: dark) {{ :root {{ {make_vars(THEMES['dark'])} }} {dark_extra} }}"
-    elif theme_mode == "라이트":
-        dynamic_css = f":root {{ {make_vars(THEMES['light'])} }}"
-    else:
-        dynamic_css = f":root {{ {make_vars(THEMES['dark'])} }} {dark_extra}"
-
-    try:
-        with open('style.css', encoding='utf-8') as f:
-            st.markdown(f"<style>{f.read()}{dynamic_css}</style>", unsafe_allow_html=True)
-    except: pass
+    # """시작 시 테마별로 미리 만들어 둔 CSS 번들을 주입하는 함수"""
+    st.markdown(THEME_CSS.get(theme_mode, ""), unsafe_allow_html=True)
 
 # 사이드바 테마 토글
 theme_choice = st.sidebar.selectbox("테마 선택", ["시스템 설정", "라이트", "다크"], index=0)
@@ -60,59 +32,10 @@ inject_custom_styles(theme_choice)
 
 # 설정 데이터 로드
 settings = db.get_settings()
-ADMIN_PASSWORD = settings.get("admin_password", "1111")
+# 설정을 불러오지 못한 경우 None (기본 비밀번호로 로그인되지 않도록 로그인을 막음)
+ADMIN_PASSWORD = settings.get("admin_password")
 STAFF_LIST = ["[암실부장] 김지원", "[회장] 유재동", "[부회장] 한지원", "[총무] 심종율", "[홍보부장] 이서윤", "[홍보차장] 김예은", "[홍보차장] 김기연"]
 
-def get_calendar_html(rentals, view_year, view_month, is_admin=False):
-    """대여 현황 캘린더 HTML 생성 (성능 최적화 버전)"""
-    calendar.setfirstweekday(calendar.SUNDAY)
-    cal = calendar.monthcalendar(view_year, view_month)
-    today = date.today()
-    
-    # [OPTIMIZATION] 루프 외부에서 이번 달에 해당하는 '확정/대여중' 데이터만 미리 필터링
-    # 캘린더 셀마다 수십 개의 데이터를 반복 검사하는 비용을 대폭 줄임
-    active_rentals = rentals[rentals['상태'].isin(['확정', '대여중'])].copy()
-    if not active_rentals.empty:
-        active_rentals['start_dt'] = pd.to_datetime(active_rentals['대여시작일']).dt.date
-        active_rentals['end_dt'] = pd.to_datetime(active_rentals['반납예정일']).dt.date
-
-    # 캘린더 기본 구조
-    html = '<div class="calendar-container"><div class="calendar-grid">'
-    for d in ["일", "월", "화", "수", "목", "금", "토"]:
-        html += f'<div class="calendar-header">{d}</div>'
-    
-    colors = ["#FF5252", "#448AFF", "#4CAF50", "#FFC107", "#9C27B0", "#00BCD4", "#E91E63"]
-    
-    for week in cal:
-        for day in week:
-            if day == 0:
-                html += '<div class="calendar-day empty"></div>'
-                continue
-                
-            day_date = date(view_year, view_month, day)
-            is_today = "today" if day_date == today else ""
-            html += f'<div class="calendar-day {is_today}"><b>{day}</b>'
-            
-            # 해당 날짜에 겹치는 대여 건 추출
-            day_matches = []
-            if not active_rentals.empty:
-                matches = active_rentals[(active_rentals['start_dt'] <= day_date) & (active_rentals['end_dt'] >= day_date)]
-                day_matches = matches.to_dict('records')
-            
-            for i, r in enumerate(day_matches[:3]):
-                color = colors[i % len(colors)]
-                acc = r.get('액세서리', '없음')
-                rem_info = f" | 비고: {r['비고']}" if is_admin and r.get('비고') else ""
-                tooltip = f"{r['신청자']} / {r['장비명']} / 액세서리: {acc}{rem_info}"
-                html += f'<div class="rental-line" style="background: {color};" data-tooltip="{tooltip}"></div>'
-            
-            if len(day_matches) > 3:
-                html += f'<div style="font-size: 0.6rem; font-weight: bold;">+ {len(day_matches)-3}건</div>'
-            html += '</div>'
-            
-    html += '</div></div>'
-    return html
-
 # ==========================================
 # [3] 내비게이션 및 페이지 레이아웃
 # ==========================================
@@ -120,6 +43,7 @@ def get_calendar_html(rentals, view_year, view_month, is_admin=False):
 page = st.sidebar.selectbox("메뉴 선택", ["📸 대여 신청 및 현황", "🛠️ 집행부 전용 관리"], key="nav")
 if st.sidebar.button("데이터 새로고침"):
     st.cache_data.clear()
+    db.invalidate_caches()
     st.rerun()
 
 # --- 1. 부원용 신청/현황 페이지 ---
@@ -130,63 +54,56 @@ if page == "📸 대여 신청 및 현황":
     if 'vy' not in st.session_state: st.session_state.vy = date.today().year
     if 'vm' not in st.session_state: st.session_state.vm = date.today().month
 
-    inventory = db.get_inventory()
-    rentals = db.get_rentals()
-
     col_l, col_r = st.columns([7, 5], gap="large")
 
     # [좌측] 대여 현황 캘린더 구역
+    def on_calendar_view():
+        """보이는 달이 창 가장자리에 가까워지면 그 달을 기준으로 창을 다시 잡음"""
+        view = st.session_state["rental_calendar"].get("view")
+        if view is not None: st.session_state.vy, st.session_state.vm = month_at(int(view))
+
+    @st.fragment
+    def render_calendar_section():
+        """캘린더 조각 - 창 안의 월 이동은 브라우저에서 처리되어 서버 리런이 없음"""
+        vy, vm = st.session_state.vy, st.session_state.vm
+        with perf.timed("render.calendar"):
+            # 창(-3 ~ +6개월)과 겹치는 '확정/대여중' 건만 조회
+            # 버전을 조회보다 먼저 읽어, 조회 도중 데이터가 바뀌어도 이전 버전 캐시에 새 내용이 섞이지 않게 함
+            version = db.get_data_version("Rentals")
+            window_rentals = db.get_rentals_in_range(*calendar_window(vy, vm), CALENDAR_STATUSES)
+            payload = get_calendar_payload(window_rentals, vy, vm, version=version)
+        render_calendar(payload, key="rental_calendar", on_view_change=on_calendar_view)
+
     with col_l:
-        n1, n2, n3 = st.columns([1, 5, 1])
-        with n1:
-            if st.button("◀", key="p_m"):
-                if st.session_state.vm == 1: st.session_state.vm = 12; st.session_state.vy -= 1
-                else: st.session_state.vm -= 1
-                st.rerun()
-        with n2: st.markdown(f"<h3 style='text-align: center;'>{st.session_state.vy}년 {st.session_state.vm}월 대여 현황</h3>", unsafe_allow_html=True)
-        with n3:
-            if st.button("▶", key="n_m"):
-                if st.session_state.vm == 12: st.session_state.vm = 1; st.session_state.vy += 1
-                else: st.session_state.vm += 1
-                st.rerun()
-        
-        st.markdown(get_calendar_html(rentals, st.session_state.vy, st.session_state.vm), unsafe_allow_html=True)
+        render_calendar_section()
 
     # [우측] 스마트 대여 신청 양식 구역
     with col_r:
         st.subheader("카메라/렌즈 대여 신청")
         
         @st.fragment
-        def render_rental_form(inv):
+        @perf.instrument("render.form")
+        def render_rental_form():
             """신청 양식 조각 (Fragment) - 위젯 조작 시 페이지 전체 리런 방지"""
+            # 조각 리런에서도 최신 장비 목록과 그 버전을 함께 읽음 (마지막 전체 리런의 목록을 재사용하지 않음)
+            inv, inv_version = db.get_inventory_snapshot()
             if inv.empty:
                 st.warning("현재 대여 가능한 장비 목록을 불러올 수 없습니다.")
                 return
 
-            # (1) 카테고리 및 모델 선택
-            raw_cats = inv[inv['구분'] == 'Body']['카테고리'].unique().tolist()
-            clean_cats = sorted(list(set([c.replace("DSLR(크롭)", "DSLR (크롭)") for c in raw_cats])))
-            sel_cat = st.selectbox("1. 카메라 카테고리", ["선택 안 함"] + clean_cats)
+            # (1) 카테고리 및 모델 선택 (장비 버전별 호환성 색인 조회)
+            compat = get_compat_index(inv_version, inv)
+            sel_cat = st.selectbox("1. 카메라 카테고리", ["선택 안 함"] + compat.categories)
             
-            mods_df = inv[(inv['구분'] == 'Body') & (inv['카테고리'] == sel_cat)]
-            mod_display_list = [f"[{row['브랜드']}] {row['모델명']}" for _, row in mods_df.iterrows()]
-            sel_mod_disp = st.selectbox("2. 카메라 모델", mod_display_list, index=None, placeholder="바디 미선택 시 렌즈만 대여 가능")
-            sel_mod = sel_mod_disp.split("] ", 1)[1] if sel_mod_disp else None
+            sel_body = st.selectbox("2. 카메라 모델", compat.bodies(sel_cat), format_func=compat.label, index=None, placeholder="바디 미선택 시 렌즈만 대여 가능")
+            sel_mod = compat.model(sel_body) if sel_body is not None else None
             
             # (2) 렌즈 호환성 필터링
-            lenses_df = inv[(inv['구분'] == 'Lens') & (inv['상태'] == '대여가능')]
-            if sel_mod:
-                b_info = mods_df[mods_df['모델명'] == sel_mod].iloc[0]
-                compat_brands = [str(b_info['브랜드']).strip()]
-                if compat_brands[0] == "Canon": compat_brands.append("Tamron")
-                lenses_df = lenses_df[lenses_df['브랜드'].isin(compat_brands)]
-                if str(b_info['규격']).strip() == "FF":
-                    lenses_df = lenses_df[lenses_df['규격'] == "FF"]
-                    st.caption("풀프레임(FF) 바디는 FF 전용 렌즈만 신청 가능합니다.")
+            if sel_body in compat.ff_only:
+                st.caption("풀프레임(FF) 바디는 FF 전용 렌즈만 신청 가능합니다.")
             
-            lens_list = [f"[{row['브랜드']}] {row['모델명']}" for _, row in lenses_df.iterrows()]
-            sel_lens_disp = st.selectbox("3. 렌즈 모델", ["선택 안 함"] + lens_list)
-            sel_lens = sel_lens_disp.split("] ", 1)[1] if sel_lens_disp != "선택 안 함" else "선택 안 함"
+            sel_lens_id = st.selectbox("3. 렌즈 모델", [None] + compat.lenses_for(sel_body), format_func=lambda i: "선택 안 함" if i is None else compat.label(i))
+            sel_lens = compat.model(sel_lens_id) if sel_lens_id is not None else "선택 안 함"
 
             # (3) 액세서리 및 요청사항
             st.write("엑세서리 추가 (선택)")
@@ -207,32 +124,58 @@ if page == "📸 대여 신청 및 현황":
             time_b = t2.text_input("반납 가능 시간 (단위: 시)", placeholder="N~M")
             st.markdown('</div>', unsafe_allow_html=True)
 
-            # (5) 제출 로직 및 무결성 검사
-            if st.button("신청서 제출하기", use_container_width=True):
-                if not u_name or not u_contact:
-                    st.error("⚠️ 성함과 연락처를 입력해 주세요.")
-                elif not time_r or not time_b:
-                    st.error("⚠️ 대여 및 반납 가능 시간을 모두 입력해 주세요.")
-                elif sel_mod is None and sel_lens == "선택 안 함":
-                    st.error("⚠️ 바디 또는 렌즈 중 최소 하나 이상의 물품을 선택해야 합니다.")
-                elif sel_mod and db.check_rental_conflict(sel_mod, start_d, end_d):
-                    st.error(f"⚠️ 선택하신 바디({sel_mod})는 해당 기간에 예약이 불가능합니다.")
-                elif sel_lens != "선택 안 함" and db.check_rental_conflict(sel_lens, start_d, end_d):
-                    st.error(f"⚠️ 선택하신 렌즈({sel_lens})는 해당 기간에 예약이 불가능합니다.")
-                else:
-                    new_data = {
-                        "신청자": u_name, "연락처": u_contact, "장비명": f"[{sel_mod if sel_mod else '바디없음'}] + [{sel_lens}]",
-                        "대여시작일": start_d.strftime("%Y-%m-%d"), "반납예정일": end_d.strftime("%Y-%m-%d"),
-                        "대면시간": f"대여: {time_r} / 반납: {time_b}", "담당자": "미지정", "상태": "대기", 
-                        "비고": "", "실제반납일": "", "액세서리": ", ".join(accs) if accs else "없음",
-                        "추가요청": extra_req if extra_req.strip() else "없음", "신청일시": datetime.now().strftime('%Y-%m-%d %H:%M')
-                    }
-                    if db.submit_rental_request(new_data):
-                        st.balloons()
-                        st.success("✅ 대여 신청이 성공적으로 완료되었습니다!")
-                        st.rerun()
+            # (5) 가용 일정 안내 - 펼쳤을 때만 계산 (계산 결과는 기간·데이터 버전별로 모든 세션이 공유)
+            avail = st.expander("🔎 대여 가능 일정 찾기", key="avail_open", on_change="rerun")
+            if avail.open:
+                with avail:
+                    # 후보: 선택한 카테고리의 바디(미선택 시 전체)와 선택한 바디의 호환 렌즈
+                    cand_bodies = compat.bodies(sel_cat) if sel_cat != "선택 안 함" else [b for c in compat.categories for b in compat.bodies(c)]
+                    cand_lenses = compat.lenses_for(sel_body)
+                    try:
+                        windows = db.find_available_windows(start_d, end_d, cand_bodies + cand_lenses)
+                        st.caption(f"{start_d:%m/%d} ~ {end_d:%m/%d} ({(end_d - start_d).days + 1}일) 기준, 예약이 겹치지 않는 가장 빠른 일정입니다.")
+                        st.dataframe(availability_table(windows, compat, cand_bodies, cand_lenses, start_d), hide_index=True, width="stretch")
+                    except db.BackendError:
+                        st.info("예약 현황을 불러올 수 없어 가능 일정을 계산하지 못했습니다.")
+
+            def unavailable(kind, name, item_id):
+                # 충돌이 확인된 경우에만 해당 장비의 가장 빠른 일정을 함께 안내
+                windows = db.find_available_windows(start_d, end_d, [item_id])
+                hint = f" 같은 기간으로는 {window_label(windows[item_id])}에 대여할 수 있습니다." if item_id in windows else ""
+                return f"⚠️ 선택하신 {kind}({name})는 해당 기간에 예약이 불가능합니다.{hint}"
+
+            # (6) 제출 로직 및 무결성 검사
+            if st.button("신청서 제출하기", width="stretch"):
+                try:
+                    if not u_name or not u_contact:
+                        st.error("⚠️ 성함과 연락처를 입력해 주세요.")
+                    elif not time_r or not time_b:
+                        st.error("⚠️ 대여 및 반납 가능 시간을 모두 입력해 주세요.")
+                    elif sel_mod is None and sel_lens == "선택 안 함":
+                        st.error("⚠️ 바디 또는 렌즈 중 최소 하나 이상의 물품을 선택해야 합니다.")
+                    elif sel_body is not None and db.check_rental_conflict(sel_body, start_d, end_d, sel_mod):
+                        st.error(unavailable("바디", sel_mod, sel_body))
+                    elif sel_lens_id is not None and db.check_rental_conflict(sel_lens_id, start_d, end_d, sel_lens):
+                        st.error(unavailable("렌즈", sel_lens, sel_lens_id))
+                    else:
+                        new_data = {
+                            "신청자": u_name, "연락처": u_contact, "장비명": f"[{sel_mod if sel_mod else '바디없음'}] + [{sel_lens}]",
+                            "body_id": int(sel_body) if sel_body is not None else None,
+                            "lens_id": int(sel_lens_id) if sel_lens_id is not None else None,
+                            "대여시작일": start_d.strftime("%Y-%m-%d"), "반납예정일": end_d.strftime("%Y-%m-%d"),
+                            "대면시간": f"대여: {time_r} / 반납: {time_b}", "담당자": "미지정", "상태": "대기", 
+                            "비고": "", "실제반납일": "", "액세서리": ", ".join(accs) if accs else "없음",
+                            "추가요청": extra_req if extra_req.strip() else "없음", "신청일시": datetime.now().strftime('%Y-%m-%d %H:%M')
+                        }
+                        if db.submit_rental_request(new_data):
+                            st.balloons()
+                            st.success("✅ 대여 신청이 성공적으로 완료되었습니다!")
+                            st.rerun()
+                except db.BackendError as e:
+                    # 예약 현황을 확인할 수 없으면 중복 신청을 막기 위해 접수하지 않음
+                    st.error(f"⚠️ 예약 현황을 확인할 수 없어 신청을 접수하지 않았습니다. 잠시 후 다시 시도해 주세요. ({e})")
 
-        render_rental_form(inventory)
+        render_rental_form()
 
 # --- 2. 집행부용 관리 페이지 ---
 elif page == "🛠️ 집행부 전용 관리":
@@ -243,7 +186,9 @@ elif page == "🛠️ 집행부 전용 관리":
     if not st.session_state.auth:
         pwd = st.text_input("집행부 비밀번호", type="password", placeholder="비밀번호를 입력해 주세요")
         if st.button("로그인"):
-            if pwd == ADMIN_PASSWORD:
+            if ADMIN_PASSWORD is None:
+                st.error("설정을 불러올 수 없어 지금은 로그인할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+            elif pwd == ADMIN_PASSWORD:
                 st.session_state.auth = True
                 st.rerun()
             else: st.error("비밀번호가 올바르지 않습니다.")
@@ -252,67 +197,172 @@ elif page == "🛠️ 집행부 전용 관리":
             st.session_state.auth = False
             st.rerun()
             
-        tabs = st.tabs(["승인 대기", "진행 중 대여", "전체 이력", "장비 목록", "설정"])
-        rentals = db.get_rentals()
-
-        with tabs[0]: # [승인 대기]
-            pending = rentals[rentals['상태'] == '대기']
-            if pending.empty: st.info("새로운 대여 신청이 없습니다.")
-            else:
-                for idx, row in pending.iterrows():
-                    with st.expander(f"신청: {row['신청자']} - {row['장비명']}"):
-                        st.write(f"**기간:** {row['대여시작일']} ~ {row['반납예정일']}")
-                        st.write(f"**액세서리:** {row['액세서리']} | **요청사항:** {row['추가요청']}")
-                        st.write(f"**신청일시:** {row['신청일시']}")
-                        c1, c2 = st.columns(2)
-                        staff = c1.selectbox("담당자 지정", STAFF_LIST, key=f"s_{idx}")
-                        rem = c2.text_input("상세 비고 (집행부용)", key=f"r_{idx}")
-                        b1, b2 = st.columns(2)
-                        if b1.button("✅ 승인(확정)", key=f"ok_{idx}", use_container_width=True):
-                            if db.update_rental_status(row['id'], "확정", staff, rem): st.rerun()
-                        if b2.button("❌ 반려(거절)", key=f"no_{idx}", use_container_width=True):
-                            if db.update_rental_status(row['id'], "취소", staff, f"[반려] {rem}"): st.rerun()
-
-        with tabs[1]: # [진행 중 대여]
-            ongoing = rentals[rentals['상태'] == '확정']
-            if ongoing.empty: st.info("현재 대여 중인 장비가 없습니다.")
-            else:
-                today_dt = date.today()
-                for idx, row in ongoing.iterrows():
-                    # D-Day 계산 로직
-                    target = pd.to_datetime(row['반납예정일']).date()
-                    diff = (target - today_dt).days
-                    d_day = f"D-{diff}" if diff > 0 else ("D-day" if diff == 0 else f"D+{abs(diff)}")
-                    d_color = "#FF5252" if diff <= 1 else "var(--text-color)"
-                    
-                    title = f"{row['신청자']} | {row['장비명']} | {row['대여시작일']} ~ {row['반납예정일']} ({d_day})"
-                    with st.expander(title):
-                        st.write(f"**상세 장비:** {row['장비명']}")
-                        st.write(f"**액세서리:** {row['액세서리']}")
-                        st.write(f"**비고:** {row['비고']}")
-                        cc1, cc2, cc3 = st.columns(3)
-                        n_rem = cc1.text_input("비고 수정", value=row['비고'], key=f"er_{idx}")
-                        if cc2.button("대기 복원", key=f"rv_{idx}", use_container_width=True):
-                            if db.update_rental_status(row['id'], "대기", row['담당자'], n_rem): st.rerun()
-                        if cc3.button("반납 완료", key=f"dn_{idx}", use_container_width=True):
-                            now_ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-                            if db.update_rental_status(row['id'], "반납완료", row['담당자'], n_rem, actual_return=now_ts): st.rerun()
-
-        with tabs[2]: st.dataframe(rentals, use_container_width=True)
-        with tabs[3]: # [자산 관리]
-            inv_data = db.get_inventory()
-            edited_inv = st.data_editor(inv_data, num_rows="dynamic", use_container_width=True)
-            if st.button("자산 데이터 저장"):
-                if db.update_inventory_list(edited_inv):
-                    st.success("자산 정보가 성공적으로 업데이트되었습니다.")
-                    st.rerun()
+        def page_selector(key, total, page_size):
+            """목록 페이지 번호 선택 (건수가 줄어 현재 페이지가 사라지면 마지막 페이지로 이동)"""
+            n_pages = page_count(total, page_size)
+            if n_pages == 1: return 1
+            if st.session_state.get(key, 1) > n_pages: st.session_state[key] = n_pages
+            return st.number_input(f"페이지 (총 {total}건, {n_pages}쪽)", min_value=1, max_value=n_pages, step=1, key=key)
+
+        # 처리 버튼 콜백: 조각이 다시 그려지기 전에 실행되므로 별도의 리런 없이 갱신된 목록이 표시됨
+        def on_review(row_ids, status, staff_key, remarks_key, prefix="", clear_key=None):
+            db.update_rental_statuses(row_ids, status, st.session_state[staff_key], prefix + st.session_state[remarks_key])
+            if clear_key: st.session_state[clear_key] = []
+
+        def on_ongoing(row_ids, status, staff=None, remarks_key=None, clear_key=None):
+            remarks = st.session_state[remarks_key] if remarks_key else None
+            actual_return = datetime.now().strftime("%Y-%m-%d %H:%M") if status == "반납완료" else None
+            db.update_rental_statuses(row_ids, status, staff, remarks, actual_return)
+            if clear_key: st.session_state[clear_key] = []
+
+        @st.fragment
+        @perf.instrument("render.admin.pending")
+        def render_pending_queue():
+            """승인 대기 목록 조각 - 처리 시 페이지 전체가 아닌 이 조각만 다시 그림"""
+            pending = db.get_rentals_by_status('대기')
+            if pending.empty:
+                st.info("새로운 대여 신청이 없습니다.")
+                return
+            with st.expander(f"📋 일괄 처리 (대기 {len(pending)}건)"):
+                labels = {r['id']: f"{r['신청자']} - {r['장비명']} ({r['대여시작일']} ~ {r['반납예정일']})" for r in to_records(pending)}
+                sel_ids = st.multiselect("처리할 신청 선택", list(labels), format_func=labels.get, key="bulk_pending")
+                if st.checkbox("대기 중인 신청 전체 선택", key="bulk_pending_all"): sel_ids = list(labels)
+                bc1, bc2 = st.columns(2)
+                bc1.selectbox("담당자 지정", STAFF_LIST, key="bulk_s")
+                bc2.text_input("상세 비고 (집행부용)", key="bulk_r")
+                bb1, bb2 = st.columns(2)
+                bb1.button(f"✅ 일괄 승인 ({len(sel_ids)}건)", key="bulk_ok", width="stretch", disabled=not sel_ids,
+                           on_click=on_review, args=(sel_ids, "확정", "bulk_s", "bulk_r"), kwargs={"clear_key": "bulk_pending"})
+                bb2.button(f"❌ 일괄 반려 ({len(sel_ids)}건)", key="bulk_no", width="stretch", disabled=not sel_ids,
+                           on_click=on_review, args=(sel_ids, "취소", "bulk_s", "bulk_r", "[반려] "), kwargs={"clear_key": "bulk_pending"})
+
+            # 현재 페이지의 건만 위젯 생성 (키는 대여 id 기준)
+            page_no = page_selector("pending_page", len(pending), QUEUE_PAGE_SIZE)
+            for row in to_records(paginate(pending, page_no, QUEUE_PAGE_SIZE)):
+                rid = row['id']
+                with st.expander(f"신청: {row['신청자']} - {row['장비명']}"):
+                    st.write(f"**기간:** {row['대여시작일']} ~ {row['반납예정일']}")
+                    st.write(f"**액세서리:** {row['액세서리']} | **요청사항:** {row['추가요청']}")
+                    st.write(f"**신청일시:** {row['신청일시']}")
+                    c1, c2 = st.columns(2)
+                    c1.selectbox("담당자 지정", STAFF_LIST, key=f"s_{rid}")
+                    c2.text_input("상세 비고 (집행부용)", key=f"r_{rid}")
+                    b1, b2 = st.columns(2)
+                    b1.button("✅ 승인(확정)", key=f"ok_{rid}", width="stretch",
+                              on_click=on_review, args=([rid], "확정", f"s_{rid}", f"r_{rid}"))
+                    b2.button("❌ 반려(거절)", key=f"no_{rid}", width="stretch",
+                              on_click=on_review, args=([rid], "취소", f"s_{rid}", f"r_{rid}", "[반려] "))
+
+        @st.fragment
+        @perf.instrument("render.admin.ongoing")
+        def render_ongoing_queue():
+            """진행 중 대여 목록 조각 - 처리 시 페이지 전체가 아닌 이 조각만 다시 그림"""
+            ongoing = db.get_rentals_by_status('확정')
+            if ongoing.empty:
+                st.info("현재 대여 중인 장비가 없습니다.")
+                return
+            with st.expander(f"📋 일괄 반납 처리 (진행 중 {len(ongoing)}건)"):
+                labels = {r['id']: f"{r['신청자']} - {r['장비명']} (~ {r['반납예정일']})" for r in to_records(ongoing)}
+                sel_ids = st.multiselect("반납 완료할 대여 선택", list(labels), format_func=labels.get, key="bulk_ongoing")
+                st.button(f"반납 완료 ({len(sel_ids)}건)", key="bulk_dn", width="stretch", disabled=not sel_ids,
+                          on_click=on_ongoing, args=(sel_ids, "반납완료"), kwargs={"clear_key": "bulk_ongoing"})
+
+            # D-Day 계산은 현재 페이지의 건만
+            page_no = page_selector("ongoing_page", len(ongoing), QUEUE_PAGE_SIZE)
+            for row in to_records(prepare_ongoing(paginate(ongoing, page_no, QUEUE_PAGE_SIZE))):
+                rid = row['id']
+                title = f"{row['신청자']} | {row['장비명']} | {row['대여시작일']} ~ {row['반납예정일']} ({row['d_day']})"
+                with st.expander(title):
+                    st.write(f"**상세 장비:** {row['장비명']}")
+                    st.write(f"**액세서리:** {row['액세서리']}")
+                    st.write(f"**비고:** {row['비고']}")
+                    cc1, cc2, cc3 = st.columns(3)
+                    cc1.text_input("비고 수정", value=row['비고'], key=f"er_{rid}")
+                    cc2.button("대기 복원", key=f"rv_{rid}", width="stretch",
+                               on_click=on_ongoing, args=([rid], "대기", row['담당자'], f"er_{rid}"))
+                    cc3.button("반납 완료", key=f"dn_{rid}", width="stretch",
+                               on_click=on_ongoing, args=([rid], "반납완료", row['담당자'], f"er_{rid}"))
+
+        @st.fragment
+        @perf.instrument("render.admin.history")
+        def render_history():
+            """전체 이력 조각 - 현재 페이지의 행만 전송"""
+            inv_items = db.get_inventory()
+            item_labels = {}
+            if not inv_items.empty and 'id' in inv_items.columns:
+                item_labels = {int(r['id']): f"[{r['구분']}] {r['브랜드']} {r['모델명']}" for r in to_records(inv_items)}
+            sel_item = st.selectbox("장비별 이력 조회", [None] + list(item_labels), format_func=lambda i: "전체 장비" if i is None else item_labels[i], key="hist_item")
+            period = None
+            if st.checkbox("기간으로 조회", key="hist_use_period"):
+                period = st.date_input("대여 기간", value=(datetime.now().date() - timedelta(days=365), datetime.now().date()), key="hist_period")
+            start_d, end_d = period if period and len(period) == 2 else (None, None)
+            # 운영 테이블 + 보관소(종료된 과거 이력)를 합쳐 현재 페이지의 행만 읽음
+            history, total = db.get_history_page(st.session_state.get("history_page", 1), HISTORY_PAGE_SIZE, start_d, end_d, sel_item)
+            page_selector("history_page", total, HISTORY_PAGE_SIZE)
+            st.dataframe(history, column_config=RENTAL_COLUMN_CONFIG, width="stretch")
+
+        # 선택된 탭만 실행 (다른 탭의 목록·위젯은 만들지 않음)
+        tabs = st.tabs(["승인 대기", "진행 중 대여", "전체 이력", "장비 목록", "설정", "성능"], key="admin_tab", on_change="rerun")
+
+        if tabs[0].open:
+            with tabs[0]: render_pending_queue()
+        if tabs[1].open:
+            with tabs[1]: render_ongoing_queue()
+        if tabs[2].open:
+            with tabs[2]: render_history()
+        if tabs[3].open:
+            with tabs[3], perf.timed("render.admin.inventory"): # [자산 관리]
+                # 편집기에는 저장소 형식으로 전달 (category 컬럼은 기존 값만 고를 수 있으므로)
+                inv_data = to_plain(db.get_inventory())
+                edited_inv = st.data_editor(inv_data, num_rows="dynamic", width="stretch")
+                if st.button("자산 데이터 저장"):
+                    summary = db.update_inventory_list(edited_inv)
+                    if summary:
+                        st.success(f"자산 정보가 업데이트되었습니다. (추가 {summary['inserted']} · 수정 {summary['updated']} · 삭제 {summary['deleted']})")
+                        st.rerun()
+
+        if tabs[4].open:
+            with tabs[4]: # [설정]
+                st.subheader("시스템 설정")
+                new_pwd = st.text_input("새 관리자 비밀번호", value=ADMIN_PASSWORD)
+                if st.button("비밀번호 변경 저장"):
+                    if db.update_settings("admin_password", new_pwd):
+                        st.success("비밀번호가 변경되었습니다.")
+                        st.rerun()
+
+                with st.expander("캐시 상태 (테이블별 버전 및 적중/미스)"):
+                    st.dataframe(pd.DataFrame(db.get_cache_stats()).T, width="stretch")
+                    st.write("**대여 데이터 동기화:**", db.get_sync_stats())
+                    st.write("**백엔드 회로 차단기:**", db.get_backend_stats())
+                    if st.button("대여 데이터 전체 재동기화"):
+                        db.force_full_resync()
+                        st.rerun()
+
+                with st.expander("데이터 이전 (장비 id 백필)"):
+                    st.caption("장비 id가 없는 과거 대여 건의 장비명을 해석해 바디/렌즈 id를 채웁니다. 장비 목록에 없는 모델은 그대로 남습니다.")
+                    if st.button("장비 id 백필 실행"):
+                        st.success(f"{db.backfill_line_items()}건의 대여 기록에 장비 id를 채웠습니다.")
+
+                with st.expander("이력 보관 (종료된 대여 건)"):
+                    archive = db.get_archive()
+                    if archive is None:
+                        st.caption("secrets에 [archive] path가 설정되어 있지 않아 보관 기능을 사용하지 않습니다.")
+                    else:
+                        stats = archive.stats()
+                        st.caption(f"보관 {stats['rows']}건 · 학기 {len(stats['semesters'])}개 · 파일 {stats['files']}개 · {stats['bytes'] / 1024:,.0f} KB")
+                        min_age = st.number_input("반납예정일로부터 경과 일수", min_value=1, value=db.get_archive_age_days(), step=30, key="archive_age")
+                        if st.button("보관 실행"):
+                            st.success(f"{db.archive_closed_rentals(int(min_age))}건의 대여 기록을 보관소로 옮겼습니다.")
 
-        with tabs[4]: # [설정]
-            st.subheader("시스템 설정")
-            new_pwd = st.text_input("새 관리자 비밀번호", value=ADMIN_PASSWORD)
-            if st.button("비밀번호 변경 저장"):
-                if db.update_settings("admin_password", new_pwd):
-                    st.success("비밀번호가 변경되었습니다.")
+        if tabs[5].open:
+            with tabs[5]: # [성능]
+                st.subheader("단계별 처리 시간")
+                st.caption(f"최근 {perf.MAX_EVENTS}건의 기록 기준 (DB 함수·백엔드 호출·화면 렌더링 단계). hit_ratio는 백엔드 호출 없이 처리된 비율입니다.")
+                st.dataframe(perf.summary(), width="stretch")
+                pc1, pc2 = st.columns(2)
+                pc1.download_button("CSV로 내보내기", perf.to_csv(), file_name=perf.export_name(), mime="text/csv", width="stretch")
+                if pc2.button("기록 초기화", width="stretch"):
+                    perf.clear()
                     st.rerun()
 
 # ==========================================
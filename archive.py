@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import frames
+from storage import RENTAL_COLUMNS
+
+# ==========================================
+# [ARCHIVE] 종료된 대여 이력 보관소 (학기별 Parquet)
+# ==========================================
+# 반납완료/취소 후 일정 기간이 지난 건은 운영 테이블에서 빼내 여기에 보관합니다.
+# 파일은 대여 시작일의 학기(semester=YYYY-1: 1~6월, YYYY-2: 7~12월) 단위로 나뉘며,
+# 조회 시 학기 폴더·컬럼·날짜 조건을 파일 수준에서 걸러 필요한 행만 읽습니다.
+
+CLOSED_STATUSES = ("반납완료", "취소")
+# 대여 기간 상한(7일)보다 넉넉한 여유. 날짜 범위 조회 시 이보다 앞 학기는 읽지 않음
+MAX_RENTAL_SPAN = pd.Timedelta(days=30)
+
+_INT_COLUMNS = ("id", "body_id", "lens_id")
+ARCHIVE_COLUMNS = RENTAL_COLUMNS + ["updated_at"]
+ARCHIVE_SCHEMA = pa.schema(
+    [(c, pa.int64() if c in _INT_COLUMNS else pa.string()) for c in ARCHIVE_COLUMNS]
+)
+_PARTITIONING = ds.partitioning(pa.schema([("semester", pa.string())]), flavor="hive")
+
+
+def semester_of(value) -> str:
+    """날짜를 학기 키로 변환합니다. (예: 2026-03-02 → '2026-1', 2026-09-01 → '2026-2')"""
+    ts = pd.Timestamp(value)
+    return f"{ts.year}-{1 if ts.month <= 6 else 2}"
+
+
+def _semesters(values: pd.Series) -> pd.Series:
+    """semester_of의 벡터 버전. 시작일이 없거나 날짜가 아닌 값이 있으면 ValueError (학기 폴더를 정할 수 없음)"""
+    ts = pd.to_datetime(values, format="ISO8601", errors="coerce")
+    if ts.isna().any():
+        raise ValueError(f"대여시작일이 없는 대여 건은 보관할 수 없습니다: {int(ts.isna().sum())}건")
+    return ts.dt.year.astype("Int64").astype(str) + np.where(ts.dt.month <= 6, "-1", "-2")
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    """보관 스키마에 맞춰 컬럼을 정렬하고 형 변환합니다. (날짜는 저장소 형식 문자열, 없는 컬럼은 빈 값)"""
+    frame = frames.to_plain(frame)
+    out = pd.DataFrame(index=frame.index)
+    for col in ARCHIVE_COLUMNS:
+        values = frame[col] if col in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+        if col in _INT_COLUMNS:
+            out[col] = pd.to_numeric(values, errors="coerce").astype("Int64")
+        else:
+            out[col] = values.astype(frames.STRING)
+    return out
+
+
+class ParquetArchive:
+    """
+    학기별로 분할된 Parquet 보관소.
+    쓰기는 추가만 하며(zstd 압축), 같은 id는 한 번만 보관합니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.lock = threading.Lock()
+        self.version = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _dataset(self):
+        return ds.dataset(self.root, format="parquet", schema=ARCHIVE_SCHEMA.append(pa.field("semester", pa.string())),
+                          partitioning=_PARTITIONING)
+
+    def _filter(self, start=None, end=None, item_id=None, statuses=None):
+        """학기 폴더 + 컬럼 조건. 날짜는 'YYYY-MM-DD' 문자열로 비교합니다."""
+        expr = None
+
+        def both(e):
+            return e if expr is None else expr & e
+
+        if end is not None:
+            expr = both(ds.field("semester") <= semester_of(end))
+            expr = both(ds.field("대여시작일") <= pd.Timestamp(end).strftime("%Y-%m-%d"))
+        if start is not None:
+            expr = both(ds.field("semester") >= semester_of(pd.Timestamp(start) - MAX_RENTAL_SPAN))
+            expr = both(ds.field("반납예정일") >= pd.Timestamp(start).strftime("%Y-%m-%d"))
+        if item_id is not None:
+            expr = both((ds.field("body_id") == int(item_id)) | (ds.field("lens_id") == int(item_id)))
+        if statuses:
+            expr = both(ds.field("상태").isin(list(statuses)))
+        return expr
+
+    def append(self, rentals: pd.DataFrame) -> int:
+        """대여 행을 보관합니다. 이미 보관된 id는 건너뛰며, 새로 보관한 건수를 반환합니다. (시작일이 없는 행이 있으면 ValueError)"""
+        if rentals is None or rentals.empty:
+            return 0
+        with self.lock:
+            frame = _normalize(rentals)
+            semesters = _semesters(frame["대여시작일"])
+            existing = set(self.ids().tolist())
+            frame = frame[~frame["id"].isin(existing)]
+            if frame.empty:
+                return 0
+            frame = frame.assign(semester=semesters)
+            table = pa.Table.from_pandas(frame, schema=ARCHIVE_SCHEMA.append(pa.field("semester", pa.string())),
+                                         preserve_index=False)
+            pq.write_to_dataset(
+                table, self.root, partition_cols=["semester"], compression="zstd",
+                basename_template=f"part-{time.time_ns()}-{{i}}.parquet",
+            )
+            self.version += 1
+            return len(frame)
+
+    def ids(self, start=None, end=None, item_id=None, statuses=None):
+        """조건에 맞는 보관 건의 id를 내림차순으로 반환합니다. (id 컬럼만 읽음)"""
+        table = self._dataset().to_table(columns=["id"], filter=self._filter(start, end, item_id, statuses))
+        return np.sort(table.column("id").to_numpy())[::-1]
+
+    def read(self, row_ids, columns=None, start=None, end=None) -> pd.DataFrame:
+        """
+        지정한 id의 행만 읽어 id 내림차순으로 반환합니다.
+        start/end가 주어지면 ids()와 같은 학기·날짜 조건을 함께 걸어, 해당 학기 폴더만 읽습니다.
+        """
+        columns = list(columns or RENTAL_COLUMNS)
+        if len(row_ids) == 0:
+            return pd.DataFrame(columns=columns)
+        expr = ds.field("id").isin([int(i) for i in row_ids])
+        period = self._filter(start, end)
+        table = self._dataset().to_table(columns=columns, filter=expr if period is None else period & expr)
+        return table.to_pandas().sort_values("id", ascending=False, ignore_index=True)
+
+    def stats(self) -> dict:
+        files = self._dataset().files
+        return {
+            "semesters": sorted({os.path.basename(os.path.dirname(f)).split("=", 1)[-1] for f in files}),
+            "files": len(files),
+            "rows": sum(pq.ParquetFile(f).metadata.num_rows for f in files),
+            "bytes": sum(os.path.getsize(f) for f in files),
+        }
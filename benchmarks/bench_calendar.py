@@ -0,0 +1,48 @@
+"""
+캘린더 렌더링 마이크로 벤치마크.
+
+    python benchmarks/bench_calendar.py [--sizes 1000 10000 100000] [--repeat 5]
+
+대여 건수별로 (1) 캐시 없는 캘린더 payload(-3 ~ +6개월 창) 생성, (2) 캐시 적중 시 반환 시간과 (3) payload 크기를 측정합니다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from datagen import make_rentals  # noqa: E402
+from frames import type_rentals  # noqa: E402
+from views import calendar_payload, get_calendar_payload  # noqa: E402
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    today = date.today()
+    print(f"{'rentals':>10} | {'build (ms)':>12} | {'cached (ms)':>12} | {'payload (KB)':>12}")
+    for n in args.sizes:
+        rentals = type_rentals(make_rentals(n))  # 앱 스냅샷과 같은 형 지정 프레임
+        build_ms = _best_of(lambda: calendar_payload(rentals, today.year, today.month), args.repeat)
+        payload = get_calendar_payload(rentals, today.year, today.month, version=n)  # 캐시 워밍
+        cached_ms = _best_of(lambda: get_calendar_payload(rentals, today.year, today.month, version=n), args.repeat)
+        size_kb = len(json.dumps(payload, ensure_ascii=False).encode("utf-8")) / 1024
+        print(f"{n:>10} | {build_ms:>12.2f} | {cached_ms:>12.3f} | {size_kb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
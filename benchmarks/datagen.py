@@ -0,0 +1,114 @@
+"""
+벤치마크용 가상 데이터 생성기.
+
+시드를 고정해 실행할 때마다 같은 Inventory / Rentals 테이블을 만듭니다.
+대여 이력은 과거 수 년치가 대부분 반납완료/취소 상태이고, 오늘 전후 구간에만 대기/확정/대여중 건이 몰리도록 구성합니다.
+"""
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from storage import SQLiteStore  # noqa: E402
+
+BRANDS = {
+    "Canon": ["EOS R", "EOS RP", "EOS R6", "EOS 5D Mark IV", "EOS 90D", "EOS M50"],
+    "Nikon": ["Z5", "Z6 II", "D750", "D7500", "Z50"],
+    "Sony": ["A7 III", "A7C", "A6400", "A6600"],
+    "Fujifilm": ["X-T4", "X-S10", "X100V"],
+}
+LENS_BRANDS = ["Canon", "Nikon", "Sony", "Fujifilm", "Tamron", "Sigma"]
+BODY_CATEGORIES = ["DSLR", "DSLR (크롭)", "미러리스", "미러리스 (크롭)"]
+FOCALS = ["24-70mm F2.8", "50mm F1.8", "35mm F1.4", "70-200mm F4", "16-35mm F4", "85mm F1.8", "18-55mm", "28-75mm F2.8"]
+
+
+def make_inventory(n_items: int = 300, seed: int = 7) -> pd.DataFrame:
+    """바디:렌즈 = 1:2 비율의 장비 목록을 생성합니다. (모델명은 고유)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    n_bodies = max(1, n_items // 3)
+    for i in range(n_items):
+        if i < n_bodies:
+            brand = list(BRANDS)[i % len(BRANDS)]
+            model = f"{BRANDS[brand][i % len(BRANDS[brand])]} #{i + 1}"
+            rows.append({"id": i + 1, "구분": "Body", "카테고리": BODY_CATEGORIES[rng.integers(len(BODY_CATEGORIES))],
+                         "브랜드": brand, "모델명": model, "규격": rng.choice(["FF", "APS-C"]), "상태": "대여가능", "비고": ""})
+        else:
+            brand = LENS_BRANDS[rng.integers(len(LENS_BRANDS))]
+            model = f"{brand} {FOCALS[rng.integers(len(FOCALS))]} #{i + 1}"
+            rows.append({"id": i + 1, "구분": "Lens", "카테고리": "렌즈", "브랜드": brand, "모델명": model,
+                         "규격": rng.choice(["FF", "APS-C"], p=[0.6, 0.4]),
+                         "상태": rng.choice(["대여가능", "수리중"], p=[0.95, 0.05]), "비고": ""})
+    return pd.DataFrame(rows)
+
+
+def make_rentals(n: int, inventory: pd.DataFrame = None, seed: int = 42, today: date = None) -> pd.DataFrame:
+    """n건의 대여 이력을 id 내림차순으로 생성합니다. (과거 이력일수록 종료 상태 비율이 높음)"""
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+    inventory = make_inventory() if inventory is None else inventory
+    bodies = inventory.loc[inventory["구분"] == "Body", ["id", "모델명"]].to_numpy()
+    lenses = inventory.loc[inventory["구분"] == "Lens", ["id", "모델명"]].to_numpy()
+
+    # 대여 시작일: 과거 4년 ~ 미래 60일, 최근일수록 밀도가 높아지도록 분포
+    span = 365 * 4
+    offsets = -((1 - rng.power(3.0, n)) * span).astype(int)
+    future = rng.random(n) < 0.02
+    offsets[future] = rng.integers(0, 60, int(future.sum()))
+    starts = pd.to_datetime(today) + pd.to_timedelta(offsets, unit="D")
+    ends = starts + pd.to_timedelta(rng.integers(0, 8, n), unit="D")
+
+    status = np.where(ends.date < today, np.where(rng.random(n) < 0.9, "반납완료", "취소"),
+                      np.where(starts.date > today, np.where(rng.random(n) < 0.5, "대기", "확정"),
+                               np.where(rng.random(n) < 0.5, "확정", "대여중")))
+    has_body = rng.random(n) < 0.85
+    has_lens = rng.random(n) < 0.8
+    body_pick = bodies[rng.integers(len(bodies), size=n)]
+    lens_pick = lenses[rng.integers(len(lenses), size=n)]
+    body = np.where(has_body, body_pick[:, 1], "바디없음")
+    lens = np.where(has_lens, lens_pick[:, 1], "선택 안 함")
+    applied = starts - pd.to_timedelta(rng.integers(1, 10, n), unit="D")
+
+    frame = pd.DataFrame({
+        "신청자": [f"부원{i}" for i in rng.integers(1, 400, n)],
+        "연락처": "010-0000-0000",
+        "장비명": [f"[{b}] + [{l}]" for b, l in zip(body, lens)],
+        "대여시작일": starts.strftime("%Y-%m-%d"),
+        "반납예정일": ends.strftime("%Y-%m-%d"),
+        "대면시간": "대여: 12~13 / 반납: 12~13",
+        "담당자": rng.choice(["[회장] 유재동", "[총무] 심종율", "미지정"], n),
+        "상태": status,
+        "비고": "",
+        "실제반납일": np.where(status == "반납완료", ends.strftime("%Y-%m-%d 18:00"), ""),
+        "액세서리": rng.choice(["없음", "카메라 충전기", "SD카드 리더기, 삼각대"], n),
+        "추가요청": "없음",
+        "신청일시": applied.strftime("%Y-%m-%d %H:%M"),
+        "body_id": pd.array(np.where(has_body, body_pick[:, 0], None), dtype="Int64"),
+        "lens_id": pd.array(np.where(has_lens, lens_pick[:, 0], None), dtype="Int64"),
+    })
+    # id는 신청일시 순서를 따름
+    frame = frame.sort_values("신청일시", ascending=False, kind="stable", ignore_index=True)
+    frame.insert(0, "id", np.arange(n, 0, -1))
+    return frame
+
+
+def build_sqlite(path: str, n_rentals: int, n_items: int = 300, seed: int = 42) -> SQLiteStore:
+    """가상 데이터를 채운 SQLite 저장소를 만듭니다. (기존 파일은 덮어씀)"""
+    if path != ":memory:":
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    store = SQLiteStore(path)
+    inventory = make_inventory(n_items)
+    rentals = make_rentals(n_rentals, inventory, seed).sort_values("id")
+    with store.lock, store.conn:
+        for table, df in (("Inventory", inventory), ("Rentals", rentals)):
+            cols = ", ".join(f'"{c}"' for c in df.columns)
+            marks = ", ".join("?" * len(df.columns))
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+            store.conn.executemany(f'INSERT INTO "{table}" ({cols}) VALUES ({marks})', rows)
+        store.conn.execute('INSERT INTO "Settings" (key, value) VALUES (?, ?)', ("admin_password", "1111"))
+    return store
@@ -0,0 +1,240 @@
+"""
+대여 시스템 주요 경로 벤치마크 하네스.
+
+    python benchmarks/run.py                                  # 1k / 10k / 100k 측정
+    python benchmarks/run.py --sizes 1000 10000 100000 1000000
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 1.3
+    python benchmarks/run.py --save-baseline benchmarks/baseline.json
+
+대여 건수별로 가상 데이터를 채운 로컬 SQLite 저장소를 만들고 아래 항목을 측정합니다. (단위: ms, 반복 측정의 중앙값)
+  - full_load         : 전체 대여 이력 최초 로드 (get_rentals, 캐시 없음)
+  - snapshot_bytes    : 대여 스냅샷 메모리 (형 지정 후, bytes)
+  - snapshot_bytes_raw: 같은 레코드를 형 지정 없이 DataFrame으로 만들었을 때의 메모리 (bytes, 비교용)
+  - calendar          : 캘린더 창(-3 ~ +6개월) 조회 + payload 생성 (캐시 없음)
+  - calendar_cached   : 캐시된 캘린더 payload 반환
+  - calendar_bytes    : 캘린더 payload JSON 크기 (bytes, 창 1회 전송량)
+  - booking_index     : 예약 인덱스 재구성
+  - conflict_check    : check_rental_conflict 1회 (평균)
+  - availability      : 전체 장비(300개)의 가장 빠른 대여 가능 일정 탐색 (find_available_windows, 예약 구간 1회 순회, 캐시 없음)
+  - availability_cached: 같은 기간·데이터 버전의 캐시된 결과 반환
+  - availability_cold : 예약 변경 직후 첫 탐색 (인덱스 재구성·구간 정렬 포함)
+  - compat_build      : 장비 호환성 색인 구성 (장비 버전당 1회)
+  - lens_filter       : 색인 기반 카테고리 → 바디 → 호환 렌즈 조회 (바디 1개당 평균)
+  - admin_prep        : 승인 대기/진행 중 조회 + D-day 계산 (캐시 없음)
+  - archive_job       : 종료 후 180일이 지난 대여 건을 학기별 Parquet 보관소로 이동 (1회)
+  - hot_rows          : 보관 후 운영 테이블에 남은 대여 건수
+  - history_page      : 운영 테이블 + 보관소를 합친 전체 이력 임의 페이지 조회 (캐시 없음)
+결과는 JSON으로 저장되며, 기준 파일이 주어지면 시간 항목 중 threshold 배를 넘고 차이가 --min-delta ms(기본 0.5) 이상인
+항목이 있을 때 종료 코드 1을 반환합니다. (bytes·건수 항목은 기록만 하고 판정하지 않음)
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+import streamlit as st  # noqa: E402
+
+import database as db  # noqa: E402
+from archive import ParquetArchive  # noqa: E402
+from datagen import build_sqlite  # noqa: E402
+from frames import memory_bytes  # noqa: E402
+from views import (CALENDAR_STATUSES, CompatIndex, calendar_payload, calendar_window,  # noqa: E402
+                   HISTORY_PAGE_SIZE, get_calendar_payload, prepare_ongoing)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _median_ms(fn, repeat: int, setup=None) -> float:
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def _cold():
+    """조회 캐시를 비워 백엔드 왕복을 포함한 시간을 측정하도록 합니다."""
+    st.cache_data.clear()
+
+
+def bench_size(n: int, repeat: int, workdir: str) -> dict:
+    store = build_sqlite(os.path.join(workdir, f"bench_{n}.db"), n)
+    db.use_store(store)
+    today = date.today()
+    results = {}
+
+    def full_load():
+        db.force_full_resync()
+        db.get_rentals()
+    results["full_load"] = _median_ms(full_load, max(1, repeat // 2))
+    # 스냅샷 메모리: 형 지정 전(레코드를 그대로 DataFrame으로) / 후
+    results["snapshot_bytes_raw"] = memory_bytes(pd.DataFrame(store.fetch_rentals()))
+    results["snapshot_bytes"] = memory_bytes(db.get_rentals())
+
+    def calendar_cold():
+        window = db.get_rentals_in_range(*calendar_window(today.year, today.month), CALENDAR_STATUSES)
+        calendar_payload(window, today.year, today.month)
+    results["calendar"] = _median_ms(calendar_cold, repeat, setup=_cold)
+
+    window = db.get_rentals_in_range(*calendar_window(today.year, today.month), CALENDAR_STATUSES)
+    payload = get_calendar_payload(window, today.year, today.month, version=db.get_data_version("Rentals"))
+    results["calendar_cached"] = _median_ms(
+        lambda: get_calendar_payload(window, today.year, today.month, version=db.get_data_version("Rentals")), repeat)
+    results["calendar_bytes"] = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    # 예약 인덱스: 스냅샷 버전을 올려 재구성을 강제
+    def rebuild_index():
+        db._RENTALS.patch(lambda df: df)
+        db.get_booking_index()
+    results["booking_index"] = _median_ms(rebuild_index, repeat)
+
+    inventory = db.get_inventory()
+    rng = random.Random(n)
+    items = list(zip(inventory["id"].tolist(), inventory["모델명"].tolist()))
+    checks = [(rng.choice(items), today + timedelta(days=d), today + timedelta(days=d + rng.randint(0, 7)))
+              for d in (rng.randint(-30, 60) for _ in range(1000))]
+    db.get_booking_index()
+    t0 = time.perf_counter()
+    for (item_id, name), s, e in checks:
+        db.check_rental_conflict(item_id, s, e, name)
+    results["conflict_check"] = round((time.perf_counter() - t0) * 1000 / len(checks), 4)
+
+    # 가용 일정 탐색: 요청 시작일·기간을 바꿔 가며 전체 장비 대상으로 측정
+    requests = [(today + timedelta(days=d), rng.randint(0, 7)) for d in (rng.randint(-7, 30) for _ in range(20))]
+
+    def availability():
+        for s, span in requests:
+            db.find_available_windows(s, s + timedelta(days=span))
+    results["availability"] = round(_median_ms(availability, repeat, setup=db._available_windows.clear) / len(requests), 4)
+    results["availability_cached"] = round(_median_ms(availability, repeat) / len(requests), 4)
+
+    def availability_cold():
+        db._RENTALS.patch(lambda df: df)
+        db.find_available_windows(today, today + timedelta(days=2))
+    results["availability_cold"] = _median_ms(availability_cold, repeat)
+
+    compat = CompatIndex(inventory)
+    results["compat_build"] = _median_ms(lambda: CompatIndex(inventory), repeat)
+
+    def lens_filter():
+        for cat in compat.categories:
+            for body_id in compat.bodies(cat):
+                [compat.label(i) for i in compat.lenses_for(body_id)]
+    n_bodies = int((inventory["구분"] == "Body").sum())
+    results["lens_filter"] = round(_median_ms(lens_filter, repeat) / max(1, n_bodies), 4)
+
+    def admin_prep():
+        db.get_rentals_by_status("대기")
+        prepare_ongoing(db.get_rentals_by_status("확정"))
+    results["admin_prep"] = _median_ms(admin_prep, repeat, setup=_cold)
+
+    # 이력 보관: 종료 후 180일이 지난 건을 보관소로 옮긴 뒤 운영 스냅샷 크기와 전체 이력 조회 시간 측정
+    db.use_archive(ParquetArchive(os.path.join(workdir, f"archive_{n}")))
+    t0 = time.perf_counter()
+    db.archive_closed_rentals(180)
+    results["archive_job"] = round((time.perf_counter() - t0) * 1000, 3)
+    results["hot_rows"] = len(db.get_rentals())
+    pages = max(1, n // HISTORY_PAGE_SIZE)
+    results["history_page"] = _median_ms(
+        lambda: db.get_history_page(rng.randint(1, pages), HISTORY_PAGE_SIZE), repeat, setup=_cold)
+    db.use_archive(None)
+
+    store.conn.close()
+    return results
+
+
+def rerun_io_check(workdir: str) -> int:
+    """캐시가 채워진 상태에서 앱 리런 시 백엔드 호출이 0회인지 확인합니다. 호출 수를 반환합니다."""
+    from streamlit.testing.v1 import AppTest
+
+    db.use_store(build_sqlite(os.path.join(workdir, "bench_rerun.db"), 1_000))
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.run()
+    at.run()  # 워밍
+    before = db.get_io_stats()["backend_calls"]
+    for _ in range(3):
+        at.run()
+    return db.get_io_stats()["backend_calls"] - before
+
+
+# 시간(ms)이 아닌 측정값 (크기·건수). 성능 저하 판정에서 제외
+NON_TIMING_METRICS = {"snapshot_bytes", "snapshot_bytes_raw", "calendar_bytes", "hot_rows"}
+# 이보다 작은 차이(ms)는 측정 잡음으로 보고 배수를 넘어도 저하로 판정하지 않음
+MIN_DELTA_MS = 0.5
+
+
+def check_regressions(results: dict, baseline: dict, threshold: float, min_delta: float = MIN_DELTA_MS) -> list:
+    """
+    기준 대비 threshold 배를 넘고 차이가 min_delta ms 이상인 시간 항목의 (크기, 항목, 기준, 현재) 목록을 반환합니다.
+    """
+    regressions = []
+    for size, metrics in results.get("sizes", {}).items():
+        for name, value in metrics.items():
+            if name in NON_TIMING_METRICS:
+                continue
+            base = baseline.get("sizes", {}).get(size, {}).get(name)
+            if base and value > base * threshold and value - base >= min_delta:
+                regressions.append((size, name, base, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_results.json"))
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.3, help="기준 대비 허용 배수 (기본 1.3)")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_MS, help=f"저하로 판정할 최소 차이 ms (기본 {MIN_DELTA_MS})")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 파일로 저장")
+    parser.add_argument("--skip-rerun-check", action="store_true", help="리런 I/O 검사 생략")
+    args = parser.parse_args()
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "machine": platform.machine(),
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            results["sizes"][str(n)] = bench_size(n, args.repeat, workdir)
+            print(f"{n:>9} rentals | " + " | ".join(f"{k} {v}" for k, v in results["sizes"][str(n)].items()), flush=True)
+        if not args.skip_rerun_check:
+            results["rerun_backend_calls"] = rerun_io_check(workdir)
+            print(f"warm rerun backend calls: {results['rerun_backend_calls']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = False
+    if results.get("rerun_backend_calls"):
+        print("❌ 캐시가 채워진 리런에서 백엔드 호출이 발생했습니다.")
+        failed = True
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for size, name, base, value in check_regressions(results, baseline, args.threshold, args.min_delta):
+            print(f"❌ 성능 저하: {size}건 {name} {base} → {value} ms (허용 {args.threshold}배)")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+
+import pandas as pd
+
+# ==========================================
+# [BOOKING INDEX] 장비별 예약 구간 인덱스
+# ==========================================
+
+# 예약 충돌 판단에 사용되는 활성 상태
+ACTIVE_STATUSES = ("확정", "대여중", "대기")
+# 장비명 문자열 안에서 '선택하지 않음'을 의미하는 자리표시자
+EMPTY_ITEMS = {"", "바디없음", "선택 안 함"}
+
+
+def parse_equipment(equipment) -> list:
+    """
+    '[바디] + [렌즈]' 형식의 장비명에서 개별 모델명 목록을 추출합니다.
+    형식에 맞지 않는 과거 데이터는 문자열 전체를 하나의 장비로 취급합니다.
+    """
+    if equipment is None or pd.isna(equipment):
+        return []
+    text = str(equipment).strip()
+    if text.startswith("[") and text.endswith("]") and "] + [" in text:
+        parts = text[1:-1].split("] + [", 1)
+    else:
+        parts = [text]
+    return [p.strip() for p in parts if p.strip() not in EMPTY_ITEMS]
+
+
+def item_lookup(inventory: pd.DataFrame) -> dict:
+    """장비 목록에서 모델명 → (장비 id, 구분) 조회표를 만듭니다. 중복 모델명은 먼저 나온 장비를 사용합니다."""
+    lookup = {}
+    if inventory is None or inventory.empty or not {"id", "구분", "모델명"}.issubset(inventory.columns):
+        return lookup
+    for item_id, kind, model in zip(inventory["id"], inventory["구분"], inventory["모델명"]):
+        if pd.notna(item_id) and pd.notna(model):
+            lookup.setdefault(str(model).strip(), (int(item_id), kind))
+    return lookup
+
+
+def resolve_line_items(equipment, lookup: dict) -> tuple:
+    """
+    장비명 문자열을 (바디 id, 렌즈 id)로 변환합니다. (기존 이력 백필용)
+    장비 목록에서 찾을 수 없는 모델은 None으로 남깁니다.
+    """
+    body_id = lens_id = None
+    for name in parse_equipment(equipment):
+        item_id, kind = lookup.get(name, (None, None))
+        if kind == "Body" and body_id is None:
+            body_id = item_id
+        elif kind == "Lens" and lens_id is None:
+            lens_id = item_id
+    return body_id, lens_id
+
+
+def _item_id(value):
+    """DataFrame에서 읽은 장비 id(float/NaN 포함)를 int 또는 None으로 정규화합니다."""
+    if value is None or pd.isna(value):
+        return None
+    return int(value)
+
+
+def booking_keys(equipment, body_id=None, lens_id=None) -> tuple:
+    """
+    예약 한 건이 점유하는 장비 키 목록.
+    장비 id가 기록된 건은 id로, 백필되지 않은 과거 건은 장비명에서 추출한 모델명으로 식별합니다.
+    """
+    ids = tuple(i for i in (_item_id(body_id), _item_id(lens_id)) if i is not None)
+    return ids if ids else tuple(parse_equipment(equipment))
+
+
+def _to_date(value):
+    """문자열/타임스탬프를 date로 변환합니다. 변환할 수 없으면 None."""
+    ts = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(ts) else ts.date()
+
+
+class BookingIndex:
+    """
+    장비 키(장비 id, 미백필 이력은 모델명) → 정렬·병합된 예약 구간 목록을 관리하는 인메모리 인덱스.
+    충돌 검사는 이진 탐색으로 O(log n)에 수행되며, 쓰기 시 해당 장비만 갱신합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bookings = {}  # 대여 id -> (장비 키 튜플, 시작일, 종료일)
+        self._raw = {}       # 장비 키 -> {대여 id: (시작일, 종료일)}
+        self._merged = {}    # 장비 키 -> (시작일 리스트, 종료일 리스트), 비중첩·정렬 상태
+        self._timeline = None  # 전체 장비의 병합 구간을 시작일 순으로 나열한 목록 (가용 일정 탐색용, 갱신 시 폐기)
+
+    @classmethod
+    def from_frame(cls, rentals: pd.DataFrame) -> "BookingIndex":
+        """대여 이력 DataFrame에서 활성 상태의 예약만 골라 인덱스를 구성합니다."""
+        index = cls()
+        needed = {"id", "장비명", "대여시작일", "반납예정일", "상태"}
+        if rentals is None or rentals.empty or not needed.issubset(rentals.columns):
+            return index
+
+        active = rentals[rentals["상태"].isin(ACTIVE_STATUSES)]
+        # 스냅샷의 날짜 컬럼은 이미 datetime64이므로 변환 없이 그대로 사용됨
+        starts = pd.to_datetime(active["대여시작일"], errors="coerce")
+        ends = pd.to_datetime(active["반납예정일"], errors="coerce")
+        valid = starts.notna() & ends.notna()
+        active = active[valid]
+        missing = [None] * len(active)
+        body_ids = active["body_id"].tolist() if "body_id" in active.columns else missing
+        lens_ids = active["lens_id"].tolist() if "lens_id" in active.columns else missing
+
+        # 행 단위 반복은 파이썬 리스트로 꺼내서 수행 (확장 dtype 원소 접근 비용 회피)
+        for row_id, equipment, body_id, lens_id, s, e in zip(
+                active["id"].tolist(), active["장비명"].tolist(), body_ids, lens_ids,
+                starts[valid].dt.date.tolist(), ends[valid].dt.date.tolist()):
+            index._put(row_id, booking_keys(equipment, body_id, lens_id), s, e)
+        for key in index._raw:
+            index._rebuild(key)
+        return index
+
+    # --- 내부 갱신 로직 (호출 측에서 잠금 보장) ---
+
+    def _put(self, row_id, keys, start, end):
+        self._bookings[row_id] = (keys, start, end)
+        for key in keys:
+            self._raw.setdefault(key, {})[row_id] = (start, end)
+        return keys
+
+    def _drop(self, row_id):
+        keys, _, _ = self._bookings.pop(row_id, ((), None, None))
+        for key in keys:
+            self._raw.get(key, {}).pop(row_id, None)
+        return keys
+
+    def _rebuild(self, key):
+        """한 장비의 구간을 시작일 기준으로 정렬하고 겹치는 구간을 병합합니다."""
+        self._timeline = None
+        intervals = sorted(self._raw.get(key, {}).values())
+        if not intervals:
+            self._raw.pop(key, None)
+            self._merged.pop(key, None)
+            return
+        starts, ends = [], []
+        for s, e in intervals:
+            if starts and s <= ends[-1]:
+                ends[-1] = max(ends[-1], e)
+            else:
+                starts.append(s)
+                ends.append(e)
+        self._merged[key] = (starts, ends)
+
+    # --- 공개 API ---
+
+    def add(self, row_id, equipment, start_date, end_date, status="대기", body_id=None, lens_id=None):
+        """새 예약(또는 변경된 예약)을 반영합니다. 비활성 상태면 인덱스에서 제거합니다."""
+        start, end = _to_date(start_date), _to_date(end_date)
+        with self._lock:
+            keys = set(self._drop(row_id))
+            if status in ACTIVE_STATUSES and start and end:
+                keys.update(self._put(row_id, booking_keys(equipment, body_id, lens_id), start, end))
+            for key in keys:
+                self._rebuild(key)
+
+    def set_status(self, row_id, status) -> bool:
+        """
+        예약 상태 변경을 반영합니다.
+        인덱스에 없는 예약이 활성 상태로 바뀌는 경우(날짜 정보 부재) False를 반환합니다.
+        """
+        with self._lock:
+            if status in ACTIVE_STATUSES:
+                return row_id in self._bookings
+            for key in self._drop(row_id):
+                self._rebuild(key)
+            return True
+
+    def has_conflict(self, key, start_date, end_date) -> bool:
+        """[start_date, end_date] 구간이 해당 장비(id 또는 모델명)의 기존 예약과 겹치는지 확인합니다."""
+        key = str(key).strip() if isinstance(key, str) else _item_id(key)
+        with self._lock:
+            merged = self._merged.get(key)
+            if not merged:
+                return False
+            starts, ends = merged
+            # 시작일이 end_date 이하인 마지막 구간만 검사하면 충분 (병합된 구간은 종료일도 정렬됨)
+            i = bisect_right(starts, end_date) - 1
+            return i >= 0 and ends[i] >= start_date
+
+    def _sorted_intervals(self) -> list:
+        """(시작일, 종료일, 장비 키) 목록을 시작일 순으로 반환합니다. 갱신 후 처음 호출될 때만 정렬합니다."""
+        if self._timeline is None:
+            self._timeline = sorted(
+                ((s, e, key) for key, (starts, ends) in self._merged.items() for s, e in zip(starts, ends)),
+                key=lambda t: t[0],
+            )
+        return self._timeline
+
+    def earliest_windows(self, item_keys: dict, start_date, days: int) -> dict:
+        """
+        장비별로 start_date 이후 days일 연속 비어 있는 가장 빠른 시작일을 구합니다.
+        item_keys는 장비 id -> 예약 키 목록(장비 id, 미백필 이력용 모델명)이며, 결과는 장비 id -> 시작일입니다.
+        장비마다 조회하지 않고, 시작일 순으로 정렬된 전체 예약 구간을 한 번 훑으며 모든 장비의 후보일을 함께 밀어냅니다.
+        """
+        owners = {}  # 예약 키 -> 해당 키를 쓰는 장비 id 목록
+        for item_id, keys in item_keys.items():
+            for key in keys:
+                owners.setdefault(key, []).append(item_id)
+        span = timedelta(days=max(1, days) - 1)
+        earliest = dict.fromkeys(item_keys, start_date)
+        pending = set(item_keys)  # 아직 뒤쪽 예약과 겹칠 수 있는 장비
+        with self._lock:
+            timeline = self._sorted_intervals()
+        for s, e, key in timeline:
+            if not pending:
+                break
+            if e < start_date:
+                continue
+            for item_id in owners.get(key, ()):
+                if item_id not in pending:
+                    continue
+                candidate = earliest[item_id]
+                if s > candidate + span:
+                    # 이후 예약은 모두 더 늦게 시작하므로 후보 구간이 확정됨
+                    pending.discard(item_id)
+                elif e >= candidate:
+                    earliest[item_id] = e + timedelta(days=1)
+        return earliest
@@ -0,0 +1,83 @@
+// ==========================================
+// [CALENDAR] 대여 현황 캘린더 클라이언트 렌더러
+// ==========================================
+// 서버가 보낸 여러 달치 payload(views.calendar_payload)로 월 이동과 툴팁을 브라우저에서 처리합니다.
+// 보이는 달이 창 가장자리에 가까워지면 view 상태를 보내 서버가 새 창을 미리 준비하도록 합니다.
+
+function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function renderMonth(grid, month, payload) {
+    grid.replaceChildren(...payload.weekdays.map((d) => el("div", "calendar-header", d)));
+    const [ty, tm, td] = payload.today;
+    const cells = month.lead + month.n;
+    for (let i = 0; i < cells + ((7 - (cells % 7)) % 7); i++) {
+        const day = i - month.lead + 1;
+        if (day < 1 || day > month.n) {
+            grid.appendChild(el("div", "calendar-day empty"));
+            continue;
+        }
+        const isToday = month.y === ty && month.m === tm && day === td;
+        const cell = el("div", isToday ? "calendar-day today" : "calendar-day");
+        cell.appendChild(el("b", "", String(day)));
+        const [tooltips, extra] = month.days[day] || [[], 0];
+        tooltips.forEach((tooltip, j) => {
+            const line = el("div", "rental-line");
+            line.style.background = payload.colors[j % payload.colors.length];
+            line.dataset.tooltip = tooltip;
+            cell.appendChild(line);
+        });
+        if (extra > 0) {
+            const more = el("div", "", `+ ${extra}건`);
+            more.style.cssText = "font-size: 0.6rem; font-weight: bold;";
+            cell.appendChild(more);
+        }
+        grid.appendChild(cell);
+    }
+}
+
+export default function (component) {
+    const { data, parentElement, setStateValue } = component;
+    if (!data || !data.months) return;
+
+    const months = new Map(data.months.map((month, pos) => [month.y * 12 + month.m - 1, pos]));
+    // 데이터가 갱신되어 다시 호출되어도 사용자가 보고 있던 달을 유지
+    let view = months.has(parentElement.calendarView) ? parentElement.calendarView : data.view;
+
+    const nav = el("div", "calendar-nav");
+    const prev = el("button", "calendar-nav-btn", "◀");
+    const title = el("h3", "calendar-nav-title");
+    const next = el("button", "calendar-nav-btn", "▶");
+    nav.append(prev, title, next);
+    const grid = el("div", "calendar-grid");
+    const container = el("div", "calendar-container");
+    container.appendChild(grid);
+    parentElement.replaceChildren(nav, container);
+
+    const render = () => {
+        const month = data.months[months.get(view)];
+        title.textContent = `${month.y}년 ${month.m}월 대여 현황`;
+        prev.disabled = !months.has(view - 1);
+        next.disabled = !months.has(view + 1);
+        renderMonth(grid, month, data);
+    };
+
+    const move = (step) => {
+        if (!months.has(view + step)) return;
+        view += step;
+        parentElement.calendarView = view;
+        render();
+        const pos = months.get(view);
+        if (pos < data.margin || pos >= data.months.length - data.margin) {
+            setStateValue("view", view);
+        }
+    };
+
+    prev.onclick = () => move(-1);
+    next.onclick = () => move(1);
+    render();
+}
@@ -1,10 +1,20 @@
+import threading
+import time
+import numpy as np
 import pandas as pd
 import streamlit as st
-from supabase import create_client, Client
-from datetime import datetime
+from supabase import create_client, Client, ClientOptions
+from datetime import date, datetime, timedelta
+import access
+import frames
+import perf
+from access import BackendError, BackendTimeout, BackendUnavailable
+from archive import ParquetArchive, ARCHIVE_COLUMNS, CLOSED_STATUSES
+from booking import BookingIndex, item_lookup, resolve_line_items
+from storage import RentalStore, SupabaseStore, SQLiteStore, RENTAL_COLUMNS, sqlite_path
 
 # ==========================================
-# [DB CONFIG] Supabase 연결 및 설정
+# [DB CONFIG] 저장소 백엔드 선택 및 연결
 # ==========================================
 
 @st.cache_resource
@@ -25,167 +35,945 @@ def get_supabase_client() -> Client:
             st.error("❌ Secrets 설정 누락: 'SUPABASE_URL' 정보가 없습니다.")
             return None
             
-        return create_client(url, key)
+        # 요청마다 시간 제한을 두어 응답 없는 백엔드가 리런을 무한정 붙잡지 않도록 함
+        return create_client(url, key, options=ClientOptions(postgrest_client_timeout=access.REQUEST_TIMEOUT))
     except Exception as e:
         st.error(f"❌ Supabase 연결 실패: {e}")
         return None
 
+def _storage_config() -> dict:
+    """secrets의 [storage] 섹션을 읽습니다. 없으면 Supabase를 사용합니다."""
+    try:
+        if "storage" in st.secrets:
+            return dict(st.secrets["storage"])
+    except Exception:
+        pass
+    return {}
+
+_store_override = None
+
+def use_store(store: RentalStore) -> None:
+    """
+    secrets 설정 대신 주어진 저장소를 사용하고 모든 캐시를 비웁니다. (벤치마크·오프라인 스크립트용)
+    """
+    global _store_override, _BREAKER
+    _store_override = store
+    _BREAKER = access.CircuitBreaker()
+    _MIRROR.reset()
+    invalidate_caches()
+    st.cache_data.clear()
+
+def get_store() -> RentalStore:
+    """
+    현재 사용 중인 저장소 백엔드를 반환합니다.
+    """
+    return _store_override or _configured_store()
+
+@st.cache_resource
+def _configured_store() -> RentalStore:
+    """
+    secrets 설정에 따라 저장소 백엔드를 생성하고 캐싱합니다.
+    [storage] backend = "sqlite" 이면 로컬 SQLite 파일을, 그 외에는 Supabase를 사용합니다.
+    """
+    config = _storage_config()
+    if config.get("backend", "supabase") == "sqlite":
+        try:
+            return SQLiteStore(sqlite_path(config.get("path", "nuriye.db")), timeout=access.REQUEST_TIMEOUT)
+        except Exception as e:
+            st.error(f"❌ SQLite 저장소 연결 실패: {e}")
+            return None
+    
+    supabase = get_supabase_client()
+    return SupabaseStore(supabase) if supabase else None
+
+# 요청 URL 길이·SQL 변수 개수 제한을 넘지 않도록 id 목록으로 한 번에 변경할 최대 건수
+WRITE_CHUNK = 500
+
+def _archive_config() -> dict:
+    """secrets의 [archive] 섹션을 읽습니다. 없으면 이력 보관 기능을 사용하지 않습니다."""
+    try:
+        if "archive" in st.secrets:
+            return dict(st.secrets["archive"])
+    except Exception:
+        pass
+    return {}
+
+_archive_override = None
+
+def use_archive(archive: ParquetArchive) -> None:
+    """
+    secrets 설정 대신 주어진 보관소를 사용합니다. (벤치마크·오프라인 스크립트용)
+    """
+    global _archive_override
+    _archive_override = archive
+    st.cache_data.clear()
+
+def get_archive() -> ParquetArchive:
+    """
+    종료된 대여 이력 보관소를 반환합니다. 설정되지 않았으면 None.
+    """
+    return _archive_override or _configured_archive()
+
+@st.cache_resource
+def _configured_archive() -> ParquetArchive:
+    """
+    [archive] path 가 설정되어 있으면 해당 디렉터리의 학기별 Parquet 보관소를 생성합니다.
+    """
+    path = _archive_config().get("path")
+    if not path: return None
+    try:
+        return ParquetArchive(sqlite_path(path))
+    except Exception as e:
+        st.error(f"❌ 이력 보관소 연결 실패: {e}")
+        return None
+
+_io_lock = threading.Lock()
+_io_stats = {"backend_calls": 0}
+# 저장소 백엔드 하나에 대한 회로 차단기 (저장소를 바꾸면 새로 생성)
+_BREAKER = access.CircuitBreaker()
+
+def _execute(method, *args, idempotent: bool = False):
+    """
+    저장소 메서드(백엔드 왕복 1회)를 시간 제한·회로 차단기 정책으로 실행하고 백엔드 호출 횟수를 집계합니다.
+    조회 메서드는 idempotent=True로 호출해 일시 장애 시 재시도하며, 실패는 BackendError로 전달됩니다.
+    """
+    with _io_lock:
+        _io_stats["backend_calls"] += 1
+    perf.note_backend_call()
+    started = time.perf_counter()
+    result, cache = None, "error"
+    try:
+        result = access.call(_BREAKER, method, *args, idempotent=idempotent)
+        cache = "miss"
+        return result
+    finally:
+        rows = len(result) if isinstance(result, list) else None
+        perf.record(f"backend.{method.__name__}", (time.perf_counter() - started) * 1000, rows=rows, cache=cache)
+
+def get_backend_stats() -> dict:
+    """
+    회로 차단기 상태(closed/open/half_open)와 연속 실패·차단 횟수를 반환합니다.
+    """
+    return _BREAKER.stats()
+
+def get_io_stats() -> dict:
+    """
+    지금까지의 백엔드 호출 횟수를 반환합니다. (리런 전후 값 비교로 리런당 호출 수 확인)
+    """
+    with _io_lock:
+        return dict(_io_stats)
+
+# ==========================================
+# [CACHE] 프로세스 공용 스냅샷 저장소 (stale-while-revalidate)
+# ==========================================
+
+# 백그라운드 갱신 스레드의 점검 주기(초)와, TTL 대비 선제 갱신 시점 비율
+REFRESH_TICK = 5
+REFRESH_AHEAD = 0.8
+
+def _same_data(old, new) -> bool:
+    """스냅샷 내용 비교 (증분 동기화는 변경이 없으면 같은 객체를 반환)"""
+    if old is new:
+        return True
+    if isinstance(old, pd.DataFrame) and isinstance(new, pd.DataFrame):
+        return old.equals(new)
+    return old == new
+
+class _TableCache:
+    """
+    테이블 하나의 스냅샷을 프로세스 단위로 캐싱합니다. (세션 간 공유)
+    - TTL이 지나도 마지막 정상 스냅샷을 즉시 반환하고, 갱신은 백그라운드에서 수행합니다.
+    - 스냅샷이 없을 때 동시에 들어온 조회는 하나의 DB 호출로 합쳐집니다.
+    - 쓰기 시 해당 테이블만 무효화하거나 제자리 갱신(patch)하며, 버전·적중/미스·갱신 시간을 기록합니다.
+    반환되는 스냅샷은 여러 세션이 공유하므로 읽기 전용으로 다뤄야 합니다.
+    """
+
+    def __init__(self, table: str, loader, ttl: int = 300):
+        self.table = table
+        self.loader = loader
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.data = None
+        self.version = 0
+        self.loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refresh_count = 0
+        self.refresh_ms = None
+        self.last_error = None
+        self._inflight = None # 진행 중인 갱신의 완료 이벤트
+
+    def _age(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def snapshot(self):
+        """
+        (데이터, 버전)을 반환합니다.
+        만료된 스냅샷은 그대로 반환하면서 갱신을 예약하고, 스냅샷이 없을 때만 로드를 기다립니다.
+        """
+        _ensure_refresher()
+        with self.lock:
+            if self.data is not None:
+                self.hits += 1
+                if self._age() >= self.ttl:
+                    self.stale_hits += 1
+                    self.refresh_async()
+                return self.data, self.version
+            self.misses += 1
+            event, leader = self._begin_refresh()
+        if leader:
+            self._refresh(event)
+        else:
+            event.wait()
+        with self.lock:
+            if self.data is None:
+                raise self.last_error or BackendError(f"{self.table} 스냅샷을 불러오지 못했습니다.")
+            return self.data, self.version
+
+    def get(self):
+        return self.snapshot()[0]
+
+    def _begin_refresh(self):
+        """진행 중인 갱신이 있으면 그 이벤트를, 없으면 새 이벤트를 만들어 (이벤트, 주도 여부)를 반환합니다."""
+        if self._inflight is not None:
+            return self._inflight, False
+        self._inflight = threading.Event()
+        return self._inflight, True
+
+    def _refresh(self, event):
+        with self.lock:
+            started_version = self.version
+        started = time.perf_counter()
+        try:
+            data = self.loader()
+            with self.lock:
+                retry = self.version != started_version and self.data is None
+                started_version = self.version
+            if retry:
+                # 스냅샷이 없는 상태에서 쓰기가 끼어들었으면 쓰기 이후 상태로 한 번 더 로드
+                data = self.loader()
+            with self.lock:
+                current = self.version == started_version
+                # 로드 도중 쓰기(patch/무효화)가 반영되었다면 이전 시점의 결과일 수 있으므로 폐기
+                # 단, 스냅샷이 없으면 기다리는 호출자를 위해 저장하되 바로 만료시켜 다음 조회 때 다시 읽음
+                if current or self.data is None:
+                    # 내용이 바뀐 경우에만 버전을 올려 파생 캐시(기간 조회, 캘린더 HTML)를 유지
+                    if self.data is not None and not _same_data(self.data, data):
+                        self.version += 1
+                    self.data = data
+                    self.loaded_at = time.monotonic() if current else 0.0
+                self.last_error = None
+        except Exception as e:
+            with self.lock:
+                self.last_error = access.classify(e)
+        finally:
+            with self.lock:
+                self.refresh_count += 1
+                self.refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+                self._inflight = None
+            event.set()
+
+    def refresh_async(self) -> bool:
+        """백그라운드 스레드에서 갱신을 시작합니다. 이미 진행 중이면 False."""
+        with self.lock:
+            event, leader = self._begin_refresh()
+        if leader:
+            threading.Thread(target=self._refresh, args=(event,), name=f"refresh-{self.table}", daemon=True).start()
+        return leader
+
+    def due(self) -> bool:
+        """이미 로드된 스냅샷이 선제 갱신 시점에 도달했는지 확인합니다."""
+        with self.lock:
+            return self.data is not None and self._inflight is None and self._age() >= self.ttl * REFRESH_AHEAD
+
+    def patch(self, fn):
+        """
+        스냅샷을 새 객체로 교체하는 방식으로 갱신합니다. (기존 스냅샷은 변경하지 않음)
+        적용된 경우 (이전 버전, 새 버전)을, 스냅샷이 없으면 None을 반환합니다.
+        """
+        with self.lock:
+            if self.data is None:
+                self.version += 1 # 스냅샷이 없어도 버전을 올려 파생 캐시를 무효화
+                return None
+            self.data = fn(self.data)
+            self.version += 1
+            return self.version - 1, self.version
+
+    def invalidate(self):
+        with self.lock:
+            self.data = None
+            self.version += 1
+
+    def expire(self):
+        """스냅샷은 유지한 채 다음 조회 때 백그라운드 갱신이 일어나도록 만료 처리합니다."""
+        with self.lock:
+            self.loaded_at = 0.0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "version": self.version, "hits": self.hits, "misses": self.misses, "stale_hits": self.stale_hits,
+                "age_sec": round(self._age(), 1) if self.data is not None else None,
+                "refresh_ms": self.refresh_ms, "refresh_count": self.refresh_count,
+                "refreshing": self._inflight is not None,
+                "last_error": str(self.last_error) if self.last_error else None,
+                "memory_kb": round(frames.memory_bytes(self.data) / 1024, 1),
+            }
+
+_refresher_lock = threading.Lock()
+_refresher = None
+
+def _refresh_loop():
+    """이미 로드된 스냅샷을 TTL 만료 전에 주기적으로 갱신합니다."""
+    while True:
+        time.sleep(REFRESH_TICK)
+        for cache in list(_caches.values()):
+            if cache.due():
+                cache.refresh_async()
+
+def _ensure_refresher():
+    global _refresher
+    if _refresher is not None and _refresher.is_alive():
+        return
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(target=_refresh_loop, name="snapshot-refresher", daemon=True)
+            _refresher.start()
+
+def get_data_version(table: str) -> int:
+    """
+    테이블 데이터 버전을 반환합니다. 다시 불러온 내용이 바뀌었거나 쓰기가 반영될 때마다 증가합니다.
+    """
+    cache = _caches.get(table)
+    return cache.version if cache else 0
+
+def get_cache_stats() -> dict:
+    """
+    테이블별 캐시 상태(버전, 적중/미스 횟수, 스냅샷 경과 시간, 갱신 소요 시간 등)를 반환합니다.
+    """
+    return {table: cache.stats() for table, cache in _caches.items()}
+
+def invalidate_caches() -> None:
+    """
+    모든 테이블 캐시를 무효화합니다. (수동 새로고침용, 대여 데이터는 증분 동기화)
+    """
+    for cache in _caches.values():
+        cache.invalidate()
+
+def force_full_resync() -> None:
+    """
+    대여 미러를 비우고 다음 조회 시 전체 테이블을 다시 불러오도록 합니다. (복구용)
+    증분 동기화로는 감지되지 않는 DB 측 행 삭제도 이때 반영됩니다.
+    """
+    _MIRROR.reset()
+    _RENTALS.invalidate()
+
+def get_sync_stats() -> dict:
+    """
+    대여 테이블 동기화 통계(마지막 동기화 방식, 전송 행 수, 전체 행 수 등)를 반환합니다.
+    """
+    return _MIRROR.stats()
+
 # ==========================================
 # [READ] 데이터 조회 함수 (캐싱 적용)
 # ==========================================
 
-@st.cache_data(ttl=300)
+def _load_inventory() -> pd.DataFrame:
+    store = get_store()
+    if not store: return pd.DataFrame()
+    
+    rows = _execute(store.fetch_inventory, idempotent=True)
+    if not rows:
+        return pd.DataFrame()
+        
+    df = pd.DataFrame(rows)
+    # 컬럼명 공백 정리
+    df.columns = [c.strip() for c in df.columns]
+    return frames.type_inventory(df)
+
+class _RentalMirror:
+    """
+    Rentals 테이블의 프로세스 로컬 미러.
+    최초(또는 강제) 동기화 때만 전체를 불러오고, 이후에는 id 최고 수위와 updated_at 기준으로
+    새로 추가·변경된 행만 가져와 병합합니다.
+    """
+
+    # 트랜잭션 커밋 지연으로 인한 누락을 막기 위해 updated_at 기준을 조금 겹쳐서 조회
+    OVERLAP = pd.Timedelta(seconds=30)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = None
+        self.max_id = None
+        self.max_updated_at = None
+        self.last_sync = {}
+        self.total_transferred = 0
+        self.sync_count = 0
+
+    def reset(self):
+        with self.lock:
+            self.frame = None
+            self.max_id = None
+            self.max_updated_at = None
+
+    def sync(self) -> pd.DataFrame:
+        with self.lock:
+            store = get_store()
+            if not store: return pd.DataFrame()
+            
+            started = time.perf_counter()
+            # updated_at 컬럼이 없으면 변경 행을 감지할 수 없으므로 항상 전체 동기화
+            rows = None
+            if self.frame is not None and 'updated_at' in self.frame.columns:
+                try:
+                    mode, rows = "delta", self._fetch_delta(store)
+                    self.frame = self._merge(self.frame, rows)
+                except BackendError:
+                    raise  # 백엔드 장애 중에는 전체 동기화로 부하를 키우지 않음
+                except Exception:
+                    rows = None
+            if rows is None:
+                mode, rows = "full", self._fetch_full(store)
+                self.frame = self._merge(frames.empty_rentals(RENTAL_COLUMNS), rows)
+            self._advance_watermarks(rows)
+
+            self.sync_count += 1
+            self.total_transferred += len(rows)
+            self.last_sync = {
+                "mode": mode, "rows_transferred": len(rows), "rows_total": len(self.frame),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "synced_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            return self.frame
+
+    def drop(self, row_ids) -> None:
+        """삭제된 행을 미러에서 제거합니다. (증분 동기화는 삭제를 감지하지 못하므로 삭제 측에서 호출)"""
+        with self.lock:
+            if self.frame is not None:
+                self.frame = self.frame[~self.frame['id'].isin(row_ids)].reset_index(drop=True)
+
+    def _fetch_full(self, store) -> list:
+        self.max_id = None
+        self.max_updated_at = None
+        return _execute(store.fetch_rentals, idempotent=True)
+
+    def _fetch_delta(self, store) -> list:
+        since = (self.max_updated_at - self.OVERLAP).isoformat() if self.max_updated_at is not None else None
+        return _execute(store.fetch_rentals_since, self.max_id or 0, since, idempotent=True)
+
+    def _merge(self, base: pd.DataFrame, rows: list) -> pd.DataFrame:
+        """변경 행으로 기존 행을 대체하고 id 내림차순을 유지합니다. (변경 행만 형 변환)"""
+        if not rows:
+            return base
+        delta = frames.type_rentals(pd.DataFrame(rows))
+        kept = base[~base['id'].isin(delta['id'])] if not base.empty else base
+        merged = frames.concat([delta, kept])
+        return merged.sort_values('id', ascending=False, ignore_index=True)
+
+    def _advance_watermarks(self, rows: list) -> None:
+        if not rows:
+            return
+        ids = [r['id'] for r in rows if r.get('id') is not None]
+        if ids:
+            self.max_id = max([self.max_id or 0] + ids)
+        stamps = pd.to_datetime([r.get('updated_at') for r in rows], errors='coerce', utc=True).dropna()
+        if len(stamps):
+            newest = stamps.max()
+            self.max_updated_at = newest if self.max_updated_at is None else max(self.max_updated_at, newest)
+
+    def stats(self) -> dict:
+        return {**self.last_sync, "sync_count": self.sync_count, "total_transferred": self.total_transferred}
+
+_MIRROR = _RentalMirror()
+
+def _load_rentals() -> pd.DataFrame:
+    return _MIRROR.sync()
+
+DEFAULT_SETTINGS = {"admin_password": "1111"}
+
+def _load_settings() -> dict:
+    store = get_store()
+    if not store: return dict(DEFAULT_SETTINGS)
+    
+    rows = _execute(store.fetch_settings, idempotent=True)
+    if not rows: return dict(DEFAULT_SETTINGS)
+    
+    return {item['key']: item['value'] for item in rows}
+
+_INVENTORY = _TableCache("Inventory", _load_inventory)
+_RENTALS = _TableCache("Rentals", _load_rentals)
+_SETTINGS = _TableCache("Settings", _load_settings)
+_caches = {"Inventory": _INVENTORY, "Rentals": _RENTALS, "Settings": _SETTINGS}
+
+@perf.instrument("db.get_inventory")
 def get_inventory() -> pd.DataFrame:
     """
     전체 장비 목록을 조회합니다. (5분 캐싱)
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return pd.DataFrame()
-        
-        response = supabase.table("Inventory").select("*").execute()
-        if not response.data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(response.data)
-        # 컬럼명 공백 정리
-        df.columns = [c.strip() for c in df.columns]
-        return df
+        return _INVENTORY.get()
     except Exception as e:
         st.error(f"❌ 장비 목록 로드 오류: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=300)
+def get_inventory_snapshot() -> tuple:
+    """
+    장비 목록과 그 데이터 버전을 함께 반환합니다.
+    버전별로 파생 색인을 캐싱할 때 (목록, 버전)이 같은 시점의 것이 되도록 한 번에 읽습니다.
+    """
+    try:
+        return _INVENTORY.snapshot()
+    except Exception as e:
+        st.error(f"❌ 장비 목록 로드 오류: {e}")
+        return pd.DataFrame(), _INVENTORY.version
+
+@perf.instrument("db.get_rentals")
 def get_rentals() -> pd.DataFrame:
     """
     전체 대여 이력을 최신순으로 조회합니다. (5분 캐싱)
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return pd.DataFrame()
-        
-        response = supabase.table("Rentals").select("*").order("id", desc=True).execute()
-        
-        # 필수 컬럼 정의 (데이터가 없을 때를 대비)
-        cols = ['id', '신청자', '연락처', '장비명', '대여시작일', '반납예정일', '대면시간', '담당자', '상태', '비고', '실제반납일', '액세서리', '추가요청', '신청일시']
-        
-        if not response.data:
-            return pd.DataFrame(columns=cols)
-            
-        return pd.DataFrame(response.data)
+        return _RENTALS.get()
     except Exception as e:
         st.error(f"❌ 대여 이력 로드 오류: {e}")
         return pd.DataFrame()
 
+# 기간·상태 조회 캐시의 안전 만료 시간(초).
+# 평소에는 대여 데이터 버전으로 무효화되지만, 버전은 이 프로세스가 대여 스냅샷을 불러온 뒤에야
+# 외부 변경(Supabase 대시보드 수정, 다른 인스턴스의 쓰기)을 반영해 올라갑니다.
+# 관리 페이지만 쓰는 프로세스처럼 스냅샷을 불러오지 않는 경우에도 이 시간이 지나면 다시 조회합니다.
+QUERY_MAX_AGE = 3600
+
+@st.cache_data(ttl=QUERY_MAX_AGE, max_entries=64, show_spinner=False)
+def _query_rentals(start, end, statuses, version, item_id=None) -> pd.DataFrame:
+    """
+    조건에 맞는 대여 건만 DB에서 조회합니다. (인자 + 대여 데이터 버전 단위 캐싱)
+    버전이 같으면 QUERY_MAX_AGE 동안 백엔드를 다시 조회하지 않습니다.
+    """
+    store = get_store()
+    if not store: return frames.empty_rentals(RENTAL_COLUMNS)
+    
+    rows = _execute(store.query_rentals, start, end, statuses, item_id, idempotent=True)
+    if not rows:
+        return frames.empty_rentals(RENTAL_COLUMNS)
+    return frames.type_rentals(pd.DataFrame(rows))
+
+def _from_snapshot(start=None, end=None, statuses=None, item_id=None):
+    """
+    마지막으로 불러온 대여 스냅샷을 조회 조건으로 걸러 반환합니다. 스냅샷이 없으면 None.
+    (백엔드 장애 시 DB 조회 대신 사용)
+    """
+    rentals = _RENTALS.data
+    if rentals is None or rentals.empty:
+        return None
+    mask = pd.Series(True, index=rentals.index)
+    if start: mask &= rentals['반납예정일'] >= pd.Timestamp(start)
+    if end: mask &= rentals['대여시작일'] <= pd.Timestamp(end)
+    if statuses: mask &= rentals['상태'].isin(statuses)
+    if item_id is not None: mask &= (rentals['body_id'] == item_id).fillna(False) | (rentals['lens_id'] == item_id).fillna(False)
+    return rentals[mask]
+
+def _read_failed(label: str, error: Exception, fallback=None) -> pd.DataFrame:
+    """
+    조회 실패 처리. 백엔드 장애이고 스냅샷 대체본이 있으면 경고와 함께 반환하고, 없으면 오류를 표시하고 빈 결과를 반환합니다.
+    """
+    if isinstance(error, BackendError) and fallback is not None:
+        st.warning(f"⚠️ {label}: 서버 응답이 원활하지 않아 마지막으로 불러온 데이터를 표시합니다. ({error})")
+        return fallback
+    st.error(f"❌ {label} 로드 오류: {error}")
+    return frames.empty_rentals(RENTAL_COLUMNS)
+
+@perf.instrument("db.get_rentals_in_range")
+def get_rentals_in_range(start_date, end_date, statuses=None) -> pd.DataFrame:
+    """
+    [start_date, end_date] 기간과 겹치는 대여 건을 최신순으로 조회합니다. (데이터 버전 단위 캐싱)
+    기간 겹침과 상태 조건은 DB에서 필터링되므로 이력이 늘어나도 조회량이 일정합니다.
+    """
+    start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    statuses = tuple(statuses) if statuses else None
+    try:
+        return _query_rentals(start, end, statuses, get_data_version("Rentals"))
+    except Exception as e:
+        return _read_failed("대여 현황", e, _from_snapshot(start, end, statuses))
+
+@perf.instrument("db.get_rentals_by_status")
+def get_rentals_by_status(status: str) -> pd.DataFrame:
+    """
+    특정 상태의 대여 건만 최신순으로 조회합니다. (데이터 버전 단위 캐싱)
+    """
+    try:
+        return _query_rentals(None, None, (status,), get_data_version("Rentals"))
+    except Exception as e:
+        return _read_failed("대여 이력", e, _from_snapshot(statuses=(status,)))
+
+@perf.instrument("db.get_rentals_for_item")
+def get_rentals_for_item(item_id: int, statuses=None) -> pd.DataFrame:
+    """
+    특정 장비(바디 또는 렌즈 id)가 포함된 대여 건을 최신순으로 조회합니다. (데이터 버전 단위 캐싱)
+    장비명 문자열 검색 대신 장비 id 일치 조건으로 DB 인덱스를 사용합니다.
+    """
+    statuses = tuple(statuses) if statuses else None
+    try:
+        return _query_rentals(None, None, statuses, get_data_version("Rentals"), int(item_id))
+    except Exception as e:
+        return _read_failed("장비별 이력", e, _from_snapshot(statuses=statuses, item_id=int(item_id)))
+
+@perf.instrument("db.get_settings")
 def get_settings() -> dict:
     """
-    시스템 설정 정보를 딕셔너리 형태로 반환합니다.
+    시스템 설정 정보를 딕셔너리 형태로 반환합니다. (5분 캐싱)
+    설정을 한 번도 불러오지 못한 채 백엔드 장애가 나면 기본값 대신 빈 딕셔너리를 반환합니다. (기본 비밀번호로 로그인되지 않도록)
     """
-    default = {"admin_password": "1111"}
     try:
-        supabase = get_supabase_client()
-        if not supabase: return default
-        
-        response = supabase.table("Settings").select("key, value").execute()
-        if not response.data: return default
-        
-        return {item['key']: item['value'] for item in response.data}
-    except:
-        return default
+        return _SETTINGS.get()
+    except Exception as e:
+        st.error(f"❌ 설정 로드 오류: {e}")
+        return {}
+
+# 예약 인덱스는 대여 스냅샷 버전에 맞춰 재구성하고, 쓰기 시에는 스냅샷과 함께 제자리 갱신
+_booking_lock = threading.Lock()
+_booking_state = {"version": None, "index": None}
+
+@perf.instrument("db.get_booking_index")
+def get_booking_index() -> BookingIndex:
+    """
+    대여 스냅샷으로 장비별 예약 구간 인덱스를 구성합니다. (스냅샷 버전이 바뀔 때만 재구성)
+    스냅샷을 불러올 수 없으면 빈 인덱스 대신 BackendError를 올립니다.
+    """
+    rentals, version = _RENTALS.snapshot()
+    with _booking_lock:
+        if _booking_state["version"] != version:
+            _booking_state["index"] = BookingIndex.from_frame(rentals)
+            _booking_state["version"] = version
+        return _booking_state["index"]
+
+def _patch_rentals(fn, index_update=None) -> None:
+    """
+    대여 스냅샷을 갱신하고, 인덱스가 직전 버전과 동기화되어 있으면 인덱스도 함께 갱신합니다.
+    인덱스를 갱신할 수 없으면 다음 조회 시 새 스냅샷으로 재구성됩니다.
+    """
+    versions = _RENTALS.patch(fn)
+    if versions is None:
+        return
+    old, new = versions
+    with _booking_lock:
+        index = _booking_state["index"]
+        if index is not None and _booking_state["version"] == old and index_update and index_update(index) is not False:
+            _booking_state["version"] = new
 
 # ==========================================
-# [WRITE] 데이터 변경 함수 (캐시 초기화 포함)
+# [WRITE] 데이터 변경 함수 (테이블별 캐시 갱신 포함)
 # ==========================================
 
+def _write_failed(label: str, error: Exception, cache: _TableCache = None) -> bool:
+    """
+    쓰기 실패 처리. 쓰기는 재시도하지 않으며 항상 실패(False)로 보고합니다.
+    시간 초과 등 일시 장애는 실제 반영 여부를 알 수 없으므로, 해당 스냅샷을 만료시켜 다음 조회 때 실제 상태를 다시 읽습니다.
+    """
+    if cache is not None and getattr(error, "transient", True):
+        cache.expire()
+    if isinstance(error, BackendTimeout):
+        st.error(f"❌ {label} 실패: 서버 응답 시간이 초과되었습니다. 반영 여부를 확인한 뒤 다시 시도해 주세요.")
+    elif isinstance(error, BackendUnavailable):
+        st.error(f"❌ {label} 실패: 서버 장애로 잠시 요청을 보내지 않고 있습니다. ({error})")
+    else:
+        st.error(f"❌ {label} 실패: {error}")
+    return False
+
+@perf.instrument("db.submit_rental_request")
 def submit_rental_request(data: dict) -> bool:
     """
     신청서 데이터를 삽입합니다. 성공 시 True를 반환합니다.
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return False
+        store = get_store()
+        if not store: return False
+        
+        inserted = _execute(store.insert_rental, data)
         
-        supabase.table("Rentals").insert(data).execute()
-        st.cache_data.clear() # 새 데이터 반영을 위한 캐시 초기화
+        # 대여 캐시만 갱신 (삽입된 행을 알 수 없으면 대여 캐시만 무효화)
+        if inserted:
+            row = {**data, **inserted}
+            _patch_rentals(
+                lambda df: frames.concat([frames.type_rentals(pd.DataFrame([row])), df]),
+                lambda index: index.add(row['id'], row['장비명'], row['대여시작일'], row['반납예정일'], row.get('상태', '대기'),
+                                        row.get('body_id'), row.get('lens_id')),
+            )
+        else:
+            _RENTALS.invalidate()
         return True
     except Exception as e:
-        st.error(f"❌ 신청서 제출 실패: {e}")
-        return False
+        return _write_failed("신청서 제출", e, _RENTALS)
 
 def update_rental_status(row_id: int, status: str, staff_name: str, remarks: str = None, actual_return: str = None) -> bool:
     """
     대여 건의 상태와 담당자 정보를 업데이트합니다.
     """
+    return update_rental_statuses([row_id], status, staff_name, remarks, actual_return)
+
+@perf.instrument("db.update_rental_statuses")
+def update_rental_statuses(row_ids: list, status: str, staff_name: str = None, remarks: str = None, actual_return: str = None) -> bool:
+    """
+    여러 대여 건의 상태를 한 번의 요청으로 일괄 업데이트합니다.
+    staff_name이 None이면 각 건의 기존 담당자를 유지하며, 캐시는 마지막에 한 번만 갱신합니다.
+    """
+    row_ids = [int(i) for i in row_ids]
+    if not row_ids: return True
     try:
-        supabase = get_supabase_client()
-        if not supabase: return False
+        store = get_store()
+        if not store: return False
         
-        update_payload = {"상태": status, "담당자": staff_name}
+        update_payload = {"상태": status}
+        if staff_name is not None: update_payload["담당자"] = staff_name
         if remarks is not None: update_payload["비고"] = remarks
         if actual_return is not None: update_payload["실제반납일"] = actual_return
         
-        supabase.table("Rentals").update(update_payload).eq("id", row_id).execute()
-        st.cache_data.clear()
+        _execute(store.update_rentals, row_ids, update_payload)
+        
+        _patch_rentals(lambda df: frames.assign(df, df['id'].isin(row_ids), update_payload),
+                       lambda index: all([index.set_status(i, status) for i in row_ids]))
         return True
     except Exception as e:
-        st.error(f"❌ 상태 업데이트 실패: {e}")
-        return False
+        return _write_failed("상태 업데이트", e, _RENTALS)
 
+@perf.instrument("db.update_settings")
 def update_settings(key: str, value: str) -> bool:
     """
     특정 설정 값을 업데이트합니다.
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return False
+        store = get_store()
+        if not store: return False
         
-        supabase.table("Settings").update({"value": value}).eq("key", key).execute()
-        st.cache_data.clear()
+        _execute(store.update_setting, key, value)
+        _SETTINGS.patch(lambda current: {**current, key: value})
         return True
-    except:
-        return False
+    except Exception as e:
+        return _write_failed("설정 저장", e, _SETTINGS)
 
-def check_rental_conflict(equipment_name: str, start_date, end_date) -> bool:
+@perf.instrument("db.check_rental_conflict")
+def check_rental_conflict(item_id: int, start_date, end_date, equipment_name: str = None) -> bool:
     """
     지정된 기간 내 특정 장비의 예약 중복 여부를 확인합니다.
+    장비 id가 일치하는 예약을 인메모리 인덱스에서 이진 탐색으로 검사하며,
+    equipment_name이 주어지면 장비 id가 백필되지 않은 과거 예약도 모델명으로 함께 검사합니다.
+    예약 현황을 불러올 수 없으면 '중복 없음'으로 처리하지 않고 BackendError를 올립니다. (호출 측에서 신청 차단)
+    """
+    index = get_booking_index()
+    if index.has_conflict(item_id, start_date, end_date):
+        return True
+    return bool(equipment_name) and index.has_conflict(equipment_name, start_date, end_date)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _booking_keys(version, _inventory) -> dict:
+    """장비 id -> 예약 키(장비 id, 미백필 과거 예약용 모델명). 장비 데이터 버전당 한 번만 구성해 모든 세션이 공유합니다."""
+    return {
+        item_id: (item_id, str(model).strip()) if model is not None else (item_id,)
+        for item_id, model in zip(_inventory["id"].tolist(), frames.to_plain(_inventory[["모델명"]])["모델명"].tolist())
+    }
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _available_windows(start_date, end_date, rentals_version, inventory_version, _item_keys) -> dict:
+    """전체 장비의 가능 일정. (요청 기간 + 대여·장비 데이터 버전 단위로 모든 세션이 공유)"""
+    days = (end_date - start_date).days + 1
+    span = timedelta(days=days - 1)
+    earliest = get_booking_index().earliest_windows(_item_keys, start_date, days)
+    return {item_id: (s, s + span) for item_id, s in earliest.items()}
+
+@perf.instrument("db.find_available_windows")
+def find_available_windows(start_date, end_date, item_ids=None) -> dict:
+    """
+    요청 기간(start_date ~ end_date)과 같은 길이로 빌릴 수 있는 가장 빠른 일정을 장비별로 구합니다.
+    반환값은 장비 id -> (가능 시작일, 가능 반납일)이며, 시작일이 start_date와 같으면 요청 기간에 바로 대여 가능합니다.
+    계산은 장비 수와 관계없이 전체 장비에 대해 예약 구간을 한 번만 훑으며, 결과는 기간·데이터 버전별로 캐싱됩니다.
+    item_ids를 주면 해당 장비만 골라 반환합니다.
+    check_rental_conflict와 같이 예약 현황을 불러올 수 없으면 BackendError를 올립니다.
+    """
+    # 버전을 계산보다 먼저 읽어, 계산 도중 바뀐 데이터가 이전 버전 결과로 캐싱되지 않게 함
+    rentals_version = get_data_version("Rentals")
+    inventory, inventory_version = _INVENTORY.snapshot()
+    if inventory is None or inventory.empty:
+        return {}
+    item_keys = _booking_keys(inventory_version, inventory)
+    windows = _available_windows(start_date, end_date, rentals_version, inventory_version, item_keys)
+    if item_ids is None:
+        return dict(windows)
+    return {int(i): windows[int(i)] for i in item_ids if int(i) in windows}
+
+@perf.instrument("db.backfill_line_items")
+def backfill_line_items() -> int:
+    """
+    장비 id가 비어 있는 기존 대여 건의 장비명을 해석해 body_id / lens_id를 채웁니다. (1회성 이전 작업)
+    같은 (바디, 렌즈) 조합끼리 묶어 조합당 최대 WRITE_CHUNK건씩 요청하며, 갱신된 건수를 반환합니다.
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return False
+        store = get_store()
+        if not store: return 0
         
-        # 최적화: 필요한 조건으로 DB에서 미리 필터링
-        res = supabase.table("Rentals") \
-            .select("대여시작일, 반납예정일") \
-            .ilike("장비명", f"%{equipment_name}%") \
-            .in_("상태", ["확정", "대여중", "대기"]) \
-            .execute()
+        rentals = get_rentals()
+        if rentals.empty: return 0
+        lookup = item_lookup(get_inventory())
         
-        if not res.data: return False
+        pending = rentals
+        for col in ('body_id', 'lens_id'):
+            if col in pending.columns:
+                pending = pending[pending[col].isna()]
+        groups = {}
+        for row_id, equipment in zip(pending['id'], pending['장비명']):
+            items = resolve_line_items(equipment, lookup)
+            if items != (None, None):
+                groups.setdefault(items, []).append(int(row_id))
         
-        for row in res.data:
-            s = pd.to_datetime(row['대여시작일']).date()
-            e = pd.to_datetime(row['반납예정일']).date()
-            if (start_date <= e) and (end_date >= s):
-                return True
-        return False
-    except:
-        return False
+        for (body_id, lens_id), row_ids in groups.items():
+            for i in range(0, len(row_ids), WRITE_CHUNK):
+                _execute(store.update_rentals, row_ids[i:i + WRITE_CHUNK], {"body_id": body_id, "lens_id": lens_id})
+        if groups:
+            # 갱신된 행은 updated_at이 바뀌므로 다음 증분 동기화에서 함께 반영됨
+            _RENTALS.invalidate()
+        return sum(len(ids) for ids in groups.values())
+    except Exception as e:
+        _write_failed("장비 id 백필", e, _RENTALS)
+        return 0
+
+# 종료 후 이 기간이 지난 대여 건을 보관 대상으로 봄 ([archive] min_age_days 로 변경 가능)
+DEFAULT_ARCHIVE_AGE_DAYS = 180
+
+def get_archive_age_days() -> int:
+    """보관 대상 기준 일수. secrets [archive] min_age_days, 없으면 DEFAULT_ARCHIVE_AGE_DAYS"""
+    return int(_archive_config().get("min_age_days", DEFAULT_ARCHIVE_AGE_DAYS))
 
-def update_inventory_list(df: pd.DataFrame) -> bool:
+@perf.instrument("db.archive_closed_rentals")
+def archive_closed_rentals(min_age_days: int = None) -> int:
     """
-    자산 목록을 일괄 업데이트(Upsert)합니다.
+    반납완료/취소 상태이고 반납예정일이 min_age_days보다 오래된 대여 건을 보관소로 옮깁니다.
+    보관소에 먼저 기록한 뒤 운영 테이블에서 삭제하며(중복 보관은 id로 걸러짐), 옮긴 건수를 반환합니다.
     """
     try:
-        supabase = get_supabase_client()
-        if not supabase: return False
+        store, archive = get_store(), get_archive()
+        if not store or archive is None: return 0
         
-        # 데이터 정제 (NaN -> None 처리로 DB 오류 방지)
-        clean_data = df.replace({pd.NA: None, float('nan'): None}).to_dict(orient='records')
-        if clean_data:
-            supabase.table("Inventory").upsert(clean_data).execute()
+        if min_age_days is None:
+            min_age_days = get_archive_age_days()
+        cutoff = pd.Timestamp(date.today() - timedelta(days=int(min_age_days)))
+        rentals = get_rentals()
+        if rentals.empty: return 0
         
-        st.cache_data.clear()
-        return True
+        # 시작일이 없는 건은 학기를 정할 수 없으므로 운영 테이블에 남김
+        closed = rentals[rentals['상태'].isin(CLOSED_STATUSES) & (rentals['반납예정일'] < cutoff) & rentals['대여시작일'].notna()]
+        if closed.empty: return 0
+        archive.append(closed)
+        
+        row_ids = [int(i) for i in closed['id']]
+        for i in range(0, len(row_ids), WRITE_CHUNK):
+            _execute(store.delete_rentals, row_ids[i:i + WRITE_CHUNK])
+        # 종료된 건은 예약 인덱스에 없으므로 미러와 스냅샷에서만 제거 (버전이 올라가 조회 캐시도 무효화됨)
+        _MIRROR.drop(row_ids)
+        _patch_rentals(lambda df: df[~df['id'].isin(row_ids)].reset_index(drop=True), lambda index: True)
+        return len(row_ids)
+    except Exception as e:
+        _write_failed("이력 보관", e, _RENTALS)
+        return 0
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _archive_ids(start, end, item_id, version, _archive) -> np.ndarray:
+    """보관소에서 조건에 맞는 id만 읽습니다. (인자 + 보관소 버전 단위 캐싱)"""
+    return _archive.ids(start, end, item_id)
+
+@perf.instrument("db.get_history_page")
+def get_history_page(page: int, page_size: int, start_date=None, end_date=None, item_id=None):
+    """
+    운영 테이블과 보관소를 합친 전체 이력의 한 페이지를 최신순으로 반환합니다. 반환값: (DataFrame, 전체 건수)
+    보관소는 id 컬럼만 먼저 읽어 페이지를 정한 뒤, 해당 페이지의 행만 학기·날짜 조건으로 걸러 읽습니다.
+    """
+    try:
+        start = start_date.strftime("%Y-%m-%d") if start_date else None
+        end = end_date.strftime("%Y-%m-%d") if end_date else None
+        hot = get_rentals() if item_id is None else get_rentals_for_item(item_id)
+        if not hot.empty:
+            if start: hot = hot[hot['반납예정일'] >= pd.Timestamp(start)]
+            if end: hot = hot[hot['대여시작일'] <= pd.Timestamp(end)]
+        
+        archive = get_archive()
+        cold_ids = _archive_ids(start, end, item_id, archive.version, archive) if archive is not None else np.array([], dtype=np.int64)
+        hot_ids = hot['id'].astype('int64').to_numpy() if not hot.empty else np.array([], dtype=np.int64)
+        all_ids = np.union1d(hot_ids, cold_ids)[::-1]
+        
+        # 범위를 벗어난 페이지는 마지막 페이지로 (views.paginate와 동일)
+        page = min(max(1, int(page)), max(1, -(-len(all_ids) // page_size)))
+        page_ids = all_ids[(page - 1) * page_size: page * page_size]
+        hot_page = hot[hot['id'].isin(page_ids)] if not hot.empty else hot
+        cold_page = archive.read(np.setdiff1d(page_ids, hot_ids), ARCHIVE_COLUMNS, start, end) if archive is not None else None
+        frame = frames.concat([hot_page, frames.type_rentals(cold_page)])
+        return frame.sort_values('id', ascending=False, ignore_index=True), len(all_ids)
+    except Exception as e:
+        st.error(f"❌ 전체 이력 로드 오류: {e}")
+        return frames.empty_rentals(RENTAL_COLUMNS), 0
+
+def diff_inventory(original: pd.DataFrame, edited: pd.DataFrame) -> dict:
+    """
+    편집된 자산 목록을 원본 스냅샷과 id 기준으로 비교합니다.
+    반환값: {"insert": 새 행 레코드, "update": 변경된 행 레코드, "delete": 삭제된 id 목록}
+    """
+    cols = [c for c in edited.columns if c != 'id']
+    is_new = edited['id'].isna()
+    inserts = frames.to_records(edited.loc[is_new, cols])
+    
+    current = edited.loc[~is_new].copy()
+    current['id'] = current['id'].astype('int64')
+    orig_ids = set(original['id'].dropna().astype('int64')) if 'id' in original.columns else set()
+    deletes = sorted(orig_ids - set(current['id']))
+    
+    # 원본에 있는 행만 값 비교 (NaN끼리는 같은 값으로 취급)
+    common = current[current['id'].isin(orig_ids)].set_index('id')
+    base = original.assign(id=original['id'].astype('int64')).set_index('id')
+    shared_cols = [c for c in cols if c in base.columns]
+    base = base.loc[common.index, shared_cols]
+    after = common[shared_cols]
+    changed = ((after.astype(object) != base.astype(object)) & ~(after.isna() & base.isna())).any(axis=1)
+    # 원본에 없던 컬럼이 생겼거나, id를 직접 입력해 추가한 행도 변경으로 처리
+    changed |= pd.Series(len(shared_cols) != len(cols), index=changed.index)
+    updated = current[~current['id'].isin(orig_ids)].set_index('id')
+    updated = pd.concat([common[changed], updated])
+    updates = frames.to_records(updated.reset_index())
+    return {"insert": inserts, "update": updates, "delete": deletes}
+
+@perf.instrument("db.update_inventory_list")
+def update_inventory_list(df: pd.DataFrame):
+    """
+    자산 목록 편집 결과를 원본과 비교해 추가·수정·삭제된 행만 반영합니다.
+    작업 유형별로 한 번씩만 요청하며, 성공 시 변경 요약 딕셔너리를, 실패 시 False를 반환합니다.
+    """
+    try:
+        store = get_store()
+        if not store: return False
+        
+        # 편집기는 저장소 형식(frames.to_plain)으로 받으므로 원본도 같은 형식으로 비교
+        original = frames.to_plain(get_inventory())
+        if 'id' not in df.columns or 'id' not in original.columns:
+            # 기본 키가 없으면 비교할 수 없으므로 전체 Upsert
+            clean_data = frames.to_records(df)
+            if clean_data:
+                _execute(store.upsert_inventory, clean_data)
+            _INVENTORY.invalidate()
+            return {"inserted": 0, "updated": len(clean_data), "deleted": 0}
+        
+        changes = diff_inventory(original, df)
+        if changes["delete"]:
+            _execute(store.delete_inventory, changes["delete"])
+        if changes["update"]:
+            _execute(store.upsert_inventory, changes["update"])
+        inserted = []
+        if changes["insert"]:
+            inserted = _execute(store.insert_inventory, changes["insert"]) or []
+        
+        # 장비 캐시만 갱신 (대여 캐시는 유지). 삽입 결과를 모르면 무효화
+        if changes["insert"] and len(inserted) != len(changes["insert"]):
+            _INVENTORY.invalidate()
+        elif any(changes.values()):
+            snapshot = pd.concat([df[df['id'].notna()], pd.DataFrame(inserted)], ignore_index=True)
+            snapshot['id'] = snapshot['id'].astype('int64')
+            _INVENTORY.patch(lambda _: frames.type_inventory(snapshot))
+        return {"inserted": len(changes["insert"]), "updated": len(changes["update"]), "deleted": len(changes["delete"])}
     except Exception as e:
-        st.error(f"❌ 자산 업데이트 실패: {e}")
-        return False
+        return _write_failed("자산 업데이트", e, _INVENTORY)
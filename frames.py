@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pandas.api.types import is_datetime64_any_dtype
+
+# ==========================================
+# [FRAMES] 대여/장비 DataFrame 형 지정 (로드 시 1회 변환)
+# ==========================================
+# 저장소에서 읽은 레코드는 스냅샷에 넣기 전에 한 번만 형을 지정합니다.
+# - 날짜: datetime64 (조회·D-day·충돌 검사에서 문자열을 다시 파싱하지 않음)
+# - 반복 값이 많은 컬럼(상태, 담당자, 구분, 브랜드 등): category
+# - 나머지 텍스트: 결측을 허용하는 pyarrow 문자열
+# 문자열 날짜·None으로의 복원은 쓰기, 보관, 화면 표시 경계(to_plain / to_records)에서만 수행합니다.
+
+STRING = pd.StringDtype("pyarrow")
+
+# 날짜 컬럼과 저장소 표기 형식
+RENTAL_DATES = {
+    "대여시작일": "%Y-%m-%d",
+    "반납예정일": "%Y-%m-%d",
+    "실제반납일": "%Y-%m-%d %H:%M",
+    "신청일시": "%Y-%m-%d %H:%M",
+}
+# 시간대가 있는 시각 컬럼 (증분 동기화 기준)
+RENTAL_TIMESTAMPS = ("updated_at",)
+RENTAL_CATEGORIES = ("상태", "담당자")
+RENTAL_TEXT = ("신청자", "연락처", "장비명", "대면시간", "비고", "액세서리", "추가요청")
+
+INVENTORY_CATEGORIES = ("구분", "카테고리", "브랜드", "규격", "상태")
+INVENTORY_TEXT = ("모델명", "비고")
+
+# id는 항상 존재, 장비 id는 백필 전 과거 건에서 비어 있을 수 있음
+_ID_COLUMNS = {"id": "int64", "body_id": "Int64", "lens_id": "Int64"}
+
+
+def _typed(frame: pd.DataFrame, dates=(), timestamps=(), categories=(), text=()) -> pd.DataFrame:
+    """알려진 컬럼만 형을 지정한 새 DataFrame을 반환합니다. (이미 지정된 컬럼은 그대로)"""
+    if frame is None:
+        return frame
+    converted = {}
+    for col, values in frame.items():
+        if col in _ID_COLUMNS:
+            dtype = _ID_COLUMNS[col] if col != "id" or values.notna().all() else "Int64"
+            if values.dtype != dtype:
+                converted[col] = pd.to_numeric(values, errors="coerce").astype(dtype)
+        elif col in dates or col in timestamps:
+            if not is_datetime64_any_dtype(values.dtype):
+                converted[col] = pd.to_datetime(values, format="ISO8601", errors="coerce", utc=col in timestamps)
+        elif col in categories:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                converted[col] = values.astype("category")
+        elif col in text:
+            if values.dtype != STRING:
+                converted[col] = values.astype(STRING)
+    if not converted:
+        return frame
+    # 컬럼별 대입 대신 한 번에 조립 (컬럼 순서 유지)
+    return pd.DataFrame({col: converted.get(col, values) for col, values in frame.items()}, index=frame.index)
+
+
+def type_rentals(frame: pd.DataFrame) -> pd.DataFrame:
+    """대여 레코드 DataFrame을 형 지정된 스냅샷 형식으로 변환합니다."""
+    return _typed(frame, RENTAL_DATES, RENTAL_TIMESTAMPS, RENTAL_CATEGORIES, RENTAL_TEXT)
+
+
+def type_inventory(frame: pd.DataFrame) -> pd.DataFrame:
+    """장비 레코드 DataFrame을 형 지정된 스냅샷 형식으로 변환합니다."""
+    return _typed(frame, categories=INVENTORY_CATEGORIES, text=INVENTORY_TEXT)
+
+
+def empty_rentals(columns) -> pd.DataFrame:
+    return type_rentals(pd.DataFrame(columns=list(columns)))
+
+
+def concat(frames: list) -> pd.DataFrame:
+    """
+    형 지정된 DataFrame들을 이어 붙입니다.
+    category 컬럼은 범주를 합쳐 맞춘 뒤 붙이므로 object로 풀리지 않습니다.
+    """
+    parts = [f for f in frames if f is not None and not f.empty] or [f for f in frames if f is not None][:1]
+    if len(parts) > 1:
+        columns = {c for f in parts for c in f.columns if isinstance(f[c].dtype, pd.CategoricalDtype)}
+        for col in columns:
+            categories = pd.Index([])
+            for f in parts:
+                if col in f.columns:
+                    values = f[col]
+                    new = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else pd.Index(values.dropna().unique())
+                    categories = categories.append(new[~new.isin(categories)])
+            dtype = pd.CategoricalDtype(categories)
+            parts = [f.assign(**{col: f[col].astype(dtype)}) if col in f.columns else f for f in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def assign(frame: pd.DataFrame, mask, values: dict) -> pd.DataFrame:
+    """mask 행에 값을 기록한 사본을 반환합니다. 새 범주는 추가하고 날짜 문자열은 변환해 컬럼 형을 유지합니다."""
+    frame = frame.copy()
+    for col, value in values.items():
+        if col in frame.columns:
+            current = frame[col]
+            if isinstance(current.dtype, pd.CategoricalDtype):
+                if value is not None and value not in current.cat.categories:
+                    frame[col] = current.cat.add_categories([value])
+            elif is_datetime64_any_dtype(current.dtype):
+                value = pd.to_datetime(value or None, format="ISO8601", errors="coerce", utc=col in RENTAL_TIMESTAMPS)
+        frame.loc[mask, col] = value
+    return frame
+
+
+def _format_dates(values: pd.Series, col: str) -> pd.Series:
+    """날짜 컬럼을 저장소 표기 문자열로 변환합니다. (pyarrow 벡터 연산, 결측은 결측 그대로)"""
+    if values.dt.tz is not None:
+        values, fmt = values.dt.tz_convert("UTC"), "%Y-%m-%dT%H:%M:%S+00:00"  # 초 단위에 소수점 이하 포함
+    else:
+        fmt = RENTAL_DATES.get(col, "%Y-%m-%d %H:%M:%S")
+    formatted = pc.strftime(pa.array(values), format=fmt)
+    # 결과는 위치 순서이므로 원래 인덱스를 그대로 붙임 (필터·슬라이스된 프레임에서 행이 어긋나지 않도록)
+    return pd.Series(formatted.to_pandas().to_numpy(), index=values.index, name=values.name)
+
+
+def to_plain(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    형 지정된 DataFrame을 저장소 형식(날짜 문자열, 결측은 None인 object 컬럼)으로 되돌립니다.
+    """
+    out = frame.copy(deep=False)
+    for col in out.columns:
+        values = out[col]
+        if values.dtype.kind in "iub" and isinstance(values.dtype, np.dtype):
+            continue  # 결측이 없는 정수·불리언은 그대로
+        if is_datetime64_any_dtype(values.dtype):
+            values = _format_dates(values, col)
+        values = values.astype(object)
+        out[col] = values.where(values.notna(), None)
+    return out
+
+
+def to_records(frame: pd.DataFrame) -> list:
+    """저장소 형식 레코드(dict) 목록으로 변환합니다. (DB 전송·화면 표시용)"""
+    return to_plain(frame).to_dict(orient="records")
+
+
+def memory_bytes(frame) -> int:
+    """DataFrame이 실제로 차지하는 메모리(문자열 객체 포함)를 바이트로 반환합니다."""
+    if not isinstance(frame, pd.DataFrame):
+        return 0
+    return int(frame.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,20 @@
+-- ==========================================
+-- [MIGRATION 001] Rentals 증분 동기화용 updated_at 컬럼
+-- Supabase SQL Editor에서 한 번 실행합니다.
+-- ==========================================
+
+alter table "Rentals" add column if not exists updated_at timestamptz not null default now();
+create index if not exists rentals_updated_at_idx on "Rentals" (updated_at);
+
+-- 행이 수정될 때마다 updated_at 자동 갱신
+create or replace function set_updated_at() returns trigger as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists rentals_set_updated_at on "Rentals";
+create trigger rentals_set_updated_at
+    before update on "Rentals"
+    for each row execute function set_updated_at();
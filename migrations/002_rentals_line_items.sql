@@ -0,0 +1,26 @@
+-- ==========================================
+-- [MIGRATION 002] Rentals 장비 항목 정규화 (body_id / lens_id)
+-- Supabase SQL Editor에서 한 번 실행합니다. (001 이후)
+-- ==========================================
+
+alter table "Rentals"
+    add column if not exists body_id bigint references "Inventory" (id) on delete set null,
+    add column if not exists lens_id bigint references "Inventory" (id) on delete set null;
+
+-- 장비별 예약 가능 여부·이력 조회용 (장비명 문자열 검색 대체)
+create index if not exists rentals_body_period_idx on "Rentals" (body_id, "대여시작일", "반납예정일");
+create index if not exists rentals_lens_period_idx on "Rentals" (lens_id, "대여시작일", "반납예정일");
+
+-- 기존 이력 백필: '[바디] + [렌즈]' 형식의 장비명을 모델명으로 해석해 장비 id를 채움
+-- 형식에 맞지 않는 과거 데이터는 문자열 전체를 하나의 모델명으로 취급합니다.
+with parsed as (
+    select id,
+           coalesce(regexp_match(trim("장비명"), '^\[(.*?)\] \+ \[(.*)\]$'), array[trim("장비명")]) as names
+    from "Rentals"
+    where body_id is null and lens_id is null and "장비명" is not null
+)
+update "Rentals" r
+set body_id = (select min(i.id) from "Inventory" i where i."구분" = 'Body' and trim(i."모델명") = any(array(select trim(n) from unnest(p.names) n))),
+    lens_id = (select min(i.id) from "Inventory" i where i."구분" = 'Lens' and trim(i."모델명") = any(array(select trim(n) from unnest(p.names) n)))
+from parsed p
+where r.id = p.id;
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+# ==========================================
+# [PERF] 경량 성능 계측 (리런 단위 단계별 기록)
+# ==========================================
+# 기록은 고정 크기 링 버퍼에 쌓이며, 집계는 관리자 '성능' 탭을 열 때만 수행합니다.
+
+MAX_EVENTS = 5000
+
+_events = deque(maxlen=MAX_EVENTS)
+_local = threading.local()
+
+
+def _backend_calls() -> int:
+    return getattr(_local, "backend_calls", 0)
+
+
+def note_backend_call() -> None:
+    """현재 스레드에서 백엔드 왕복이 발생했음을 기록합니다. (캐시 적중/미스 판정용)"""
+    _local.backend_calls = _backend_calls() + 1
+
+
+def _measure(result):
+    """반환값의 행 수와 (얕은) 메모리 크기를 추정합니다."""
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=False, deep=False).sum())
+    if isinstance(result, (list, tuple, dict)):
+        return len(result), None
+    return None, None
+
+
+def record(stage: str, duration_ms: float, rows=None, nbytes=None, cache=None) -> None:
+    _events.append((time.time(), stage, duration_ms, rows, nbytes, cache))
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    with 블록의 소요 시간을 기록합니다.
+    블록 안에서 백엔드 호출이 있었으면 cache='miss', 없었으면 'hit'으로 남깁니다.
+    """
+    calls = _backend_calls()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        cache = "miss" if _backend_calls() > calls else "hit"
+        record(stage, (time.perf_counter() - started) * 1000, cache=cache)
+
+
+def instrument(stage: str):
+    """함수 호출의 소요 시간, 반환 행 수·바이트, 캐시 적중 여부를 기록하는 데코레이터"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            calls = _backend_calls()
+            started = time.perf_counter()
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            finally:
+                duration = (time.perf_counter() - started) * 1000
+                rows, nbytes = _measure(result)
+                cache = "miss" if _backend_calls() > calls else "hit"
+                record(stage, duration, rows, nbytes, cache)
+        return wrapper
+    return decorator
+
+
+def events() -> pd.DataFrame:
+    """링 버퍼의 기록을 DataFrame으로 반환합니다."""
+    frame = pd.DataFrame(list(_events), columns=["ts", "stage", "duration_ms", "rows", "bytes", "cache"])
+    frame["ts"] = pd.to_datetime(frame["ts"], unit="s")
+    return frame
+
+
+def summary() -> pd.DataFrame:
+    """단계별 호출 수, p50/p95/최대 소요 시간(ms), 평균 행 수·바이트, 캐시 적중률을 집계합니다."""
+    frame = events()
+    if frame.empty:
+        return pd.DataFrame(columns=["calls", "p50_ms", "p95_ms", "max_ms", "avg_rows", "avg_bytes", "hit_ratio"])
+    grouped = frame.groupby("stage")
+    result = pd.DataFrame({
+        "calls": grouped.size(),
+        "p50_ms": grouped["duration_ms"].quantile(0.5),
+        "p95_ms": grouped["duration_ms"].quantile(0.95),
+        "max_ms": grouped["duration_ms"].max(),
+        "avg_rows": grouped["rows"].mean(),
+        "avg_bytes": grouped["bytes"].mean(),
+        "hit_ratio": grouped["cache"].apply(lambda c: (c == "hit").mean()),
+    })
+    return result.round(2).sort_values("p95_ms", ascending=False)
+
+
+def to_csv() -> bytes:
+    """원본 기록을 CSV(UTF-8 BOM, 엑셀 호환)로 내보냅니다."""
+    return events().to_csv(index=False).encode("utf-8-sig")
+
+
+def export_name() -> str:
+    return f"nuriye_perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+
+def clear() -> None:
+    _events.clear()
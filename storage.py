@@ -0,0 +1,296 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+# ==========================================
+# [STORAGE] 저장소 인터페이스 및 백엔드 구현
+# ==========================================
+# database.py의 공개 함수는 모두 이 인터페이스를 통해 데이터에 접근합니다.
+# 메서드 하나가 백엔드 왕복 한 번에 대응하며, 결과는 행 딕셔너리 목록으로 반환합니다.
+
+RENTAL_COLUMNS = ['id', '신청자', '연락처', '장비명', '대여시작일', '반납예정일', '대면시간', '담당자', '상태', '비고', '실제반납일', '액세서리', '추가요청', '신청일시', 'body_id', 'lens_id']
+INVENTORY_COLUMNS = ['id', '구분', '카테고리', '브랜드', '모델명', '규격', '상태', '비고']
+
+
+class RentalStore(ABC):
+    """대여 시스템 저장소 인터페이스. (Inventory / Rentals / Settings)"""
+
+    name = "base"
+
+    # --- 조회 ---
+    @abstractmethod
+    def fetch_inventory(self) -> list:
+        ...
+
+    @abstractmethod
+    def fetch_rentals(self) -> list:
+        """전체 대여 이력 (id 내림차순)"""
+
+    @abstractmethod
+    def fetch_rentals_since(self, max_id: int, updated_since: str = None) -> list:
+        """id가 max_id보다 크거나, updated_at이 updated_since 이후인 행 (증분 동기화용)"""
+
+    @abstractmethod
+    def query_rentals(self, start: str = None, end: str = None, statuses: tuple = None, item_id: int = None) -> list:
+        """[start, end] 기간과 겹치고 상태가 statuses에 속하며, item_id 장비(바디 또는 렌즈)를 포함하는 행 (id 내림차순)"""
+
+    @abstractmethod
+    def fetch_settings(self) -> list:
+        ...
+
+    # --- 변경 ---
+    @abstractmethod
+    def insert_rental(self, data: dict) -> dict:
+        """삽입된 행(id 포함)을 반환합니다. 알 수 없으면 None."""
+
+    @abstractmethod
+    def update_rentals(self, row_ids: list, payload: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete_rentals(self, row_ids: list) -> None:
+        ...
+
+    @abstractmethod
+    def update_setting(self, key: str, value: str) -> None:
+        ...
+
+    @abstractmethod
+    def insert_inventory(self, rows: list) -> list:
+        ...
+
+    @abstractmethod
+    def upsert_inventory(self, rows: list) -> None:
+        """id가 같은 행은 주어진 컬럼만 갱신하고(행을 지우고 다시 넣지 않음), 없는 id는 삽입합니다."""
+
+    @abstractmethod
+    def delete_inventory(self, row_ids: list) -> None:
+        """삭제된 장비를 가리키던 대여 건의 body_id/lens_id는 NULL이 됩니다. (ON DELETE SET NULL)"""
+
+
+# ==========================================
+# [SUPABASE] 원격 PostgreSQL 백엔드
+# ==========================================
+
+class SupabaseStore(RentalStore):
+    """Supabase(PostgREST) 클라이언트를 사용하는 기본 저장소"""
+
+    name = "supabase"
+
+    def __init__(self, client):
+        self.client = client
+
+    def fetch_inventory(self) -> list:
+        return self.client.table("Inventory").select("*").execute().data or []
+
+    def fetch_rentals(self) -> list:
+        return self.client.table("Rentals").select("*").order("id", desc=True).execute().data or []
+
+    def fetch_rentals_since(self, max_id: int, updated_since: str = None) -> list:
+        query = self.client.table("Rentals").select("*")
+        if updated_since is not None:
+            query = query.or_(f'id.gt.{max_id or 0},updated_at.gte."{updated_since}"')
+        else:
+            query = query.gt("id", max_id or 0)
+        return query.execute().data or []
+
+    def query_rentals(self, start: str = None, end: str = None, statuses: tuple = None, item_id: int = None) -> list:
+        query = self.client.table("Rentals").select("*")
+        if start is not None: query = query.gte("반납예정일", start)
+        if end is not None: query = query.lte("대여시작일", end)
+        if statuses: query = query.in_("상태", list(statuses))
+        if item_id is not None: query = query.or_(f"body_id.eq.{int(item_id)},lens_id.eq.{int(item_id)}")
+        return query.order("id", desc=True).execute().data or []
+
+    def fetch_settings(self) -> list:
+        return self.client.table("Settings").select("key, value").execute().data or []
+
+    def insert_rental(self, data: dict) -> dict:
+        rows = self.client.table("Rentals").insert(data).execute().data
+        return rows[0] if rows else None
+
+    def update_rentals(self, row_ids: list, payload: dict) -> None:
+        query = self.client.table("Rentals").update(payload)
+        query = query.eq("id", row_ids[0]) if len(row_ids) == 1 else query.in_("id", row_ids)
+        query.execute()
+
+    def delete_rentals(self, row_ids: list) -> None:
+        self.client.table("Rentals").delete().in_("id", row_ids).execute()
+
+    def update_setting(self, key: str, value: str) -> None:
+        self.client.table("Settings").update({"value": value}).eq("key", key).execute()
+
+    def insert_inventory(self, rows: list) -> list:
+        return self.client.table("Inventory").insert(rows).execute().data or []
+
+    def upsert_inventory(self, rows: list) -> None:
+        self.client.table("Inventory").upsert(rows).execute()
+
+    def delete_inventory(self, row_ids: list) -> None:
+        self.client.table("Inventory").delete().in_("id", row_ids).execute()
+
+
+# ==========================================
+# [SQLITE] 로컬 파일 백엔드 (오프라인 배포 및 성능 측정 기준선)
+# ==========================================
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "Inventory" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "구분" TEXT, "카테고리" TEXT, "브랜드" TEXT, "모델명" TEXT, "규격" TEXT, "상태" TEXT, "비고" TEXT
+);
+CREATE TABLE IF NOT EXISTS "Rentals" (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "신청자" TEXT, "연락처" TEXT, "장비명" TEXT, "대여시작일" TEXT, "반납예정일" TEXT, "대면시간" TEXT,
+    "담당자" TEXT, "상태" TEXT, "비고" TEXT, "실제반납일" TEXT, "액세서리" TEXT, "추가요청" TEXT, "신청일시" TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    body_id INTEGER REFERENCES "Inventory" (id) ON DELETE SET NULL,
+    lens_id INTEGER REFERENCES "Inventory" (id) ON DELETE SET NULL
+);
+CREATE TABLE IF NOT EXISTS "Settings" (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE INDEX IF NOT EXISTS rentals_status_idx ON "Rentals" ("상태");
+CREATE INDEX IF NOT EXISTS rentals_period_idx ON "Rentals" ("대여시작일", "반납예정일");
+CREATE INDEX IF NOT EXISTS rentals_updated_at_idx ON "Rentals" (updated_at);
+CREATE INDEX IF NOT EXISTS inventory_type_idx ON "Inventory" ("구분", "카테고리");
+
+CREATE TRIGGER IF NOT EXISTS rentals_set_updated_at AFTER UPDATE ON "Rentals"
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at BEGIN
+    UPDATE "Rentals" SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+"""
+
+# 장비 id 컬럼이 없던 기존 파일에 컬럼을 추가한 뒤 생성하는 인덱스 (장비별 기간 조회용)
+_SQLITE_LINE_ITEMS = """
+DROP INDEX IF EXISTS rentals_equipment_idx;
+CREATE INDEX IF NOT EXISTS rentals_body_period_idx ON "Rentals" (body_id, "대여시작일", "반납예정일");
+CREATE INDEX IF NOT EXISTS rentals_lens_period_idx ON "Rentals" (lens_id, "대여시작일", "반납예정일");
+"""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteStore(RentalStore):
+    """
+    단일 SQLite 파일을 사용하는 로컬 저장소.
+    상태·기간·updated_at 컬럼과 장비 id별 기간(body_id 또는 lens_id + 대여시작일·반납예정일)에 인덱스를 두며,
+    프로세스 내 모든 세션이 하나의 연결을 잠금으로 공유합니다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "nuriye.db", timeout: float = 5.0):
+        self.path = path
+        self.lock = threading.Lock()
+        # timeout: 다른 프로세스가 쓰기 잠금을 쥐고 있을 때 기다리는 최대 시간(초)
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            if path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SQLITE_SCHEMA)
+            existing = {r[1] for r in self.conn.execute('PRAGMA table_info("Rentals")')}
+            for col in ("body_id", "lens_id"):
+                if col not in existing:
+                    self.conn.execute(f'ALTER TABLE "Rentals" ADD COLUMN {col} INTEGER REFERENCES "Inventory" (id) ON DELETE SET NULL')
+                # 외래 키 적용 전에 삭제된 장비를 가리키게 된 행 정리 (ON DELETE SET NULL과 같은 결과)
+                self.conn.execute(f'UPDATE "Rentals" SET {col} = NULL WHERE {col} IS NOT NULL AND {col} NOT IN (SELECT id FROM "Inventory")')
+            self.conn.executescript(_SQLITE_LINE_ITEMS)
+        # 연결 단위 설정이며 트랜잭션 밖에서 켜야 함 (Supabase와 같이 장비 삭제 시 대여 건의 장비 id를 NULL로)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+    def _select(self, sql: str, params=()) -> list:
+        with self.lock:
+            return [dict(r) for r in self.conn.execute(sql, params).fetchall()]
+
+    def _columns(self, table: str) -> set:
+        with self.lock:
+            return {r[1] for r in self.conn.execute(f"PRAGMA table_info({_quote(table)})")}
+
+    def _insert(self, table: str, rows: list, upsert: bool = False) -> list:
+        """
+        행 목록을 삽입하고 삽입된 행을 반환합니다. 스키마에 없는 키는 무시합니다.
+        upsert면 id가 이미 있는 행은 주어진 컬럼만 갱신합니다. (INSERT OR REPLACE처럼 행을 지웠다 넣지 않으므로 참조 행이 유지됨)
+        """
+        cols = self._columns(table)
+        ids = []
+        with self.lock, self.conn:
+            for row in rows:
+                keys = [k for k in row if k in cols]
+                sql = f"INSERT INTO {_quote(table)} ({', '.join(map(_quote, keys))}) VALUES ({', '.join('?' * len(keys))})"
+                if upsert and "id" in keys:
+                    updates = ", ".join(f"{_quote(k)} = excluded.{_quote(k)}" for k in keys if k != "id")
+                    sql += f" ON CONFLICT(id) DO UPDATE SET {updates}" if updates else " ON CONFLICT(id) DO NOTHING"
+                cursor = self.conn.execute(sql, [row[k] for k in keys])
+                ids.append(row["id"] if upsert and row.get("id") is not None else cursor.lastrowid)
+        if not ids:
+            return []
+        marks = ", ".join("?" * len(ids))
+        return self._select(f"SELECT * FROM {_quote(table)} WHERE id IN ({marks}) ORDER BY id", ids)
+
+    def fetch_inventory(self) -> list:
+        return self._select('SELECT * FROM "Inventory" ORDER BY id')
+
+    def fetch_rentals(self) -> list:
+        return self._select('SELECT * FROM "Rentals" ORDER BY id DESC')
+
+    def fetch_rentals_since(self, max_id: int, updated_since: str = None) -> list:
+        if updated_since is None:
+            return self._select('SELECT * FROM "Rentals" WHERE id > ?', (max_id or 0,))
+        return self._select('SELECT * FROM "Rentals" WHERE id > ? OR updated_at >= ?', (max_id or 0, updated_since))
+
+    def query_rentals(self, start: str = None, end: str = None, statuses: tuple = None, item_id: int = None) -> list:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('"반납예정일" >= ?'); params.append(start)
+        if end is not None:
+            clauses.append('"대여시작일" <= ?'); params.append(end)
+        if statuses:
+            clauses.append(f'"상태" IN ({", ".join("?" * len(statuses))})'); params.extend(statuses)
+        if item_id is not None:
+            clauses.append('(body_id = ? OR lens_id = ?)'); params.extend((int(item_id), int(item_id)))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._select(f'SELECT * FROM "Rentals" {where} ORDER BY id DESC', params)
+
+    def fetch_settings(self) -> list:
+        return self._select('SELECT key, value FROM "Settings"')
+
+    def insert_rental(self, data: dict) -> dict:
+        rows = self._insert("Rentals", [data])
+        return rows[0] if rows else None
+
+    def update_rentals(self, row_ids: list, payload: dict) -> None:
+        sets = ", ".join(f"{_quote(k)} = ?" for k in payload)
+        marks = ", ".join("?" * len(row_ids))
+        with self.lock, self.conn:
+            self.conn.execute(f'UPDATE "Rentals" SET {sets} WHERE id IN ({marks})', [*payload.values(), *row_ids])
+
+    def delete_rentals(self, row_ids: list) -> None:
+        marks = ", ".join("?" * len(row_ids))
+        with self.lock, self.conn:
+            self.conn.execute(f'DELETE FROM "Rentals" WHERE id IN ({marks})', list(row_ids))
+
+    def update_setting(self, key: str, value: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute('INSERT INTO "Settings" (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value', (key, value))
+
+    def insert_inventory(self, rows: list) -> list:
+        return self._insert("Inventory", rows)
+
+    def upsert_inventory(self, rows: list) -> None:
+        self._insert("Inventory", rows, upsert=True)
+
+    def delete_inventory(self, row_ids: list) -> None:
+        marks = ", ".join("?" * len(row_ids))
+        with self.lock, self.conn:
+            self.conn.execute(f'DELETE FROM "Inventory" WHERE id IN ({marks})', list(row_ids))
+
+
+def sqlite_path(path: str) -> str:
+    """상대 경로는 앱 디렉터리 기준으로 해석합니다."""
+    if path == ":memory:" or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 앱 모듈(database, frames 등)은 저장소 최상위에 있으므로 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+import pytest
+
+import frames
+from archive import ParquetArchive, _semesters
+
+
+def _closed(starts) -> pd.DataFrame:
+    n = len(starts)
+    return frames.type_rentals(pd.DataFrame({
+        "id": range(1, n + 1),
+        "장비명": ["[EOS R] + [RF 50mm]"] * n,
+        "대여시작일": starts,
+        "반납예정일": starts,
+        "상태": ["반납완료"] * n,
+    }))
+
+
+def test_semesters_use_integer_year():
+    assert _semesters(pd.Series(["2024-03-02", "2024-09-01"])).tolist() == ["2024-1", "2024-2"]
+
+
+def test_semesters_reject_missing_start_date():
+    with pytest.raises(ValueError):
+        _semesters(pd.Series(["2024-03-02", None]))
+
+
+def test_append_filtered_frame_keeps_dates(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    rentals = _closed(["2024-03-02", "2024-09-01", "2024-10-15", "2025-02-01"])
+    archive.append(rentals.iloc[1:])  # 인덱스가 1부터 시작하는 프레임
+    folders = sorted(os.listdir(tmp_path))
+    assert folders == ["semester=2024-2", "semester=2025-1"]
+    assert archive.ids(start="2024-10-01", end="2024-10-31").tolist() == [3]
+    stored = archive.read([2, 3, 4])
+    assert stored.set_index("id")["대여시작일"].to_dict() == {2: "2024-09-01", 3: "2024-10-15", 4: "2025-02-01"}
+
+
+def test_read_with_period_skips_other_semesters(tmp_path):
+    archive = ParquetArchive(str(tmp_path))
+    archive.append(_closed(["2024-03-02", "2024-09-01", "2025-02-01"]))
+    assert archive.read([1, 2, 3], start="2024-08-01", end="2024-12-31")["id"].tolist() == [2]
+    assert archive.read([1, 2, 3])["id"].tolist() == [3, 2, 1]
@@ -0,0 +1,153 @@
+from datetime import date
+
+import pandas as pd
+
+from booking import BookingIndex, booking_keys, parse_equipment
+
+
+def d(day: int) -> date:
+    return date(2026, 3, day)
+
+
+def _index(rows) -> BookingIndex:
+    """(id, 장비명, 시작일, 반납일, 상태, body_id, lens_id) 목록으로 인덱스를 만듭니다."""
+    frame = pd.DataFrame(rows, columns=["id", "장비명", "대여시작일", "반납예정일", "상태", "body_id", "lens_id"])
+    return BookingIndex.from_frame(frame.astype({"body_id": "Int64", "lens_id": "Int64"}))
+
+
+def test_parse_equipment_skips_placeholders():
+    assert parse_equipment("[EOS R] + [RF 50mm]") == ["EOS R", "RF 50mm"]
+    assert parse_equipment("[바디없음] + [RF 50mm]") == ["RF 50mm"]
+    assert parse_equipment("[EOS R] + [선택 안 함]") == ["EOS R"]
+    assert parse_equipment(None) == [] and parse_equipment(float("nan")) == []
+
+
+def test_booking_keys_prefer_item_ids():
+    assert booking_keys("[EOS R] + [RF 50mm]", 1, 2) == (1, 2)
+    assert booking_keys("[EOS R] + [RF 50mm]", 1, None) == (1,)
+    assert booking_keys("[EOS R] + [RF 50mm]") == ("EOS R", "RF 50mm")
+
+
+def test_conflict_bounds_are_inclusive():
+    index = _index([(1, "[EOS R] + [선택 안 함]", "2026-03-05", "2026-03-07", "확정", 1, None)])
+    assert index.has_conflict(1, d(7), d(9))
+    assert index.has_conflict(1, d(1), d(5))
+    assert index.has_conflict(1, d(6), d(6))
+    assert not index.has_conflict(1, d(8), d(10))
+    assert not index.has_conflict(1, d(1), d(4))
+    assert not index.has_conflict(2, d(5), d(7))
+
+
+def test_overlapping_bookings_are_merged():
+    index = _index([
+        (1, "", "2026-03-01", "2026-03-05", "확정", 1, None),
+        (2, "", "2026-03-03", "2026-03-10", "대여중", 1, None),  # 앞 건과 겹침
+        (3, "", "2026-03-02", "2026-03-04", "대기", 1, None),   # 앞 건 안에 포함
+        (4, "", "2026-03-20", "2026-03-21", "확정", 1, None),
+    ])
+    assert index._merged[1] == ([d(1), d(20)], [d(10), d(21)])
+    assert index.has_conflict(1, d(9), d(12))
+    assert not index.has_conflict(1, d(11), d(19))
+
+
+def test_inactive_statuses_are_ignored():
+    index = _index([
+        (1, "", "2026-03-01", "2026-03-05", "반납완료", 1, None),
+        (2, "", "2026-03-01", "2026-03-05", "취소", 1, None),
+    ])
+    assert not index.has_conflict(1, d(1), d(5))
+
+
+def test_legacy_names_match_exactly():
+    index = _index([(1, "[EOS RP] + [RF 50mm]", "2026-03-05", "2026-03-07", "확정", None, None)])
+    assert index.has_conflict("EOS RP", d(5), d(5))
+    assert index.has_conflict(" EOS RP ", d(5), d(5))
+    assert not index.has_conflict("EOS R", d(5), d(5))
+    assert not index.has_conflict("RF 50", d(5), d(5))
+
+
+def test_add_replaces_and_removes_bookings():
+    index = BookingIndex()
+    index.add(10, "[EOS R] + [RF 50mm]", "2026-03-05", "2026-03-07", "대기", body_id=1, lens_id=2)
+    assert index.has_conflict(1, d(6), d(6)) and index.has_conflict(2, d(6), d(6))
+    # 같은 id로 다시 추가하면 기존 구간을 대체 (날짜·장비 변경)
+    index.add(10, "[EOS R] + [선택 안 함]", "2026-03-10", "2026-03-11", "확정", body_id=1)
+    assert not index.has_conflict(1, d(6), d(6)) and index.has_conflict(1, d(10), d(10))
+    assert not index.has_conflict(2, d(10), d(10))
+    # 비활성 상태로 추가하면 제거
+    index.add(10, "[EOS R] + [선택 안 함]", "2026-03-10", "2026-03-11", "취소", body_id=1)
+    assert not index.has_conflict(1, d(10), d(10))
+
+
+def test_set_status():
+    index = _index([
+        (1, "", "2026-03-05", "2026-03-07", "확정", 1, None),
+        (2, "", "2026-03-06", "2026-03-09", "확정", 1, None),
+    ])
+    assert index.set_status(1, "반납완료")
+    assert index.has_conflict(1, d(8), d(8))       # 2번 건은 남음
+    assert not index.has_conflict(1, d(5), d(5))   # 1번 건만의 구간은 해제
+    assert index.set_status(2, "대여중")            # 이미 있는 건의 활성 상태 변경
+    assert not index.set_status(3, "확정")          # 날짜를 모르는 건은 재구성 필요
+
+
+def _windows(index, keys, start, days):
+    return index.earliest_windows(keys, start, days)
+
+
+def test_earliest_windows_single_sweep():
+    index = _index([
+        (1, "", "2026-03-05", "2026-03-07", "확정", 1, None),
+        (2, "", "2026-03-09", "2026-03-10", "확정", 1, None),
+        (3, "", "2026-03-12", "2026-03-12", "대기", 1, None),
+        (4, "", "2026-03-01", "2026-03-30", "취소", 2, None),
+    ])
+    keys = {1: (1,), 2: (2,), 3: (3,)}
+    # 2일: 3/5~7 → 3/8 시작은 3/9와 겹침 → 3/11 시작은 3/12와 겹침 → 3/13
+    assert _windows(index, keys, d(5), 2) == {1: d(13), 2: d(5), 3: d(5)}
+    # 1일짜리는 3/8 사이 빈틈에 들어감
+    assert _windows(index, keys, d(5), 1)[1] == d(8)
+    # 요청 시작일 이전에 끝난 예약은 무시, 이전에 시작해 걸쳐 있는 예약은 반영
+    assert _windows(index, keys, d(2), 3)[1] == d(2)
+    assert _windows(index, keys, d(6), 1)[1] == d(8)
+
+
+def test_earliest_windows_use_id_and_legacy_name_keys():
+    index = _index([
+        (1, "[EOS R] + [선택 안 함]", "2026-03-05", "2026-03-06", "확정", 1, None),
+        (2, "[EOS RP] + [선택 안 함]", "2026-03-07", "2026-03-08", "확정", None, None),  # 백필 전 과거 건
+        (3, "[EOS R] + [선택 안 함]", "2026-03-09", "2026-03-09", "확정", None, None),
+    ])
+    keys = {1: (1, "EOS R"), 2: (2, "EOS RP")}
+    assert _windows(index, keys, d(5), 1) == {1: d(7), 2: d(5)}
+    assert _windows(index, keys, d(7), 2) == {1: d(7), 2: d(9)}
+    assert _windows(index, keys, d(7), 3) == {1: d(10), 2: d(9)}
+
+
+def test_earliest_windows_match_conflict_check():
+    """가능 일정 시작일은 충돌이 없어야 하고, 그 이전의 모든 시작일은 충돌이 있어야 함"""
+    rows, rid = [], 0
+    for item in (1, 2, 3):
+        for start, end in ((3, 4), (4, 8), (11, 12), (14, 14), (16, 20)):
+            rid += 1
+            rows.append((rid, "", f"2026-03-{start + item:02d}", f"2026-03-{end + item:02d}", "확정", item, None))
+    index = _index(rows)
+    keys = {1: (1,), 2: (2,), 3: (3,), 4: (4,)}
+    for days in range(1, 5):
+        for start in range(1, 10):
+            result = _windows(index, keys, d(start), days)
+            for item, found in result.items():
+                span = (found - d(start)).days
+                assert not index.has_conflict(item, found, date.fromordinal(found.toordinal() + days - 1))
+                for shift in range(span):
+                    s = date.fromordinal(d(start).toordinal() + shift)
+                    assert index.has_conflict(item, s, date.fromordinal(s.toordinal() + days - 1))
+
+
+def test_earliest_windows_see_index_updates():
+    index = _index([(1, "", "2026-03-05", "2026-03-06", "확정", 1, None)])
+    assert _windows(index, {1: (1,)}, d(5), 1)[1] == d(7)
+    index.add(2, "", "2026-03-07", "2026-03-07", "대기", body_id=1)
+    assert _windows(index, {1: (1,)}, d(5), 1)[1] == d(8)
+    index.set_status(1, "취소")
+    assert _windows(index, {1: (1,)}, d(5), 1)[1] == d(5)
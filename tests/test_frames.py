@@ -0,0 +1,32 @@
+import pandas as pd
+
+import frames
+
+
+def _rentals(n: int = 6) -> pd.DataFrame:
+    return frames.type_rentals(pd.DataFrame({
+        "id": range(1, n + 1),
+        "대여시작일": [f"2026-03-{d:02d}" for d in range(1, n + 1)],
+        "반납예정일": [f"2026-03-{d + 2:02d}" for d in range(1, n + 1)],
+        "실제반납일": [None] * (n - 1) + ["2026-03-09 14:30"],
+        "상태": ["대기", "확정"] * (n // 2),
+        "updated_at": ["2026-03-01T00:00:00+00:00"] * n,
+    }))
+
+
+def test_to_plain_round_trip():
+    plain = frames.to_plain(_rentals())
+    assert plain["대여시작일"].tolist()[:2] == ["2026-03-01", "2026-03-02"]
+    assert plain["실제반납일"].tolist()[-2:] == [None, "2026-03-09 14:30"]
+    assert pd.Timestamp(plain["updated_at"].iloc[0]) == pd.Timestamp("2026-03-01T00:00:00+00:00")
+
+
+def test_to_plain_keeps_rows_of_filtered_frame():
+    """인덱스가 0..n-1이 아닌 프레임(필터·슬라이스·역순)에서도 날짜가 제 행에 남아야 함"""
+    typed = _rentals()
+    for part in (typed[typed["상태"] == "확정"], typed.iloc[3:], typed.iloc[::-1]):
+        records = frames.to_records(part)
+        assert [r["id"] for r in records] == part["id"].tolist()
+        for r in records:
+            assert r["대여시작일"] == f"2026-03-{r['id']:02d}"
+            assert r["반납예정일"] == f"2026-03-{r['id'] + 2:02d}"
@@ -0,0 +1,61 @@
+import os
+from datetime import date
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import database as db
+from storage import SQLiteStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app():
+    """장비 3개와 대여 3건을 채운 인메모리 SQLite 저장소로 앱을 띄웁니다."""
+    store = SQLiteStore(":memory:")
+    store.insert_inventory([
+        {"구분": "Body", "카테고리": "미러리스", "브랜드": "Canon", "모델명": "EOS RP", "규격": "FF", "상태": "대여가능"},
+        {"구분": "Lens", "카테고리": "렌즈", "브랜드": "Canon", "모델명": "RF 50mm", "규격": "FF", "상태": "대여가능"},
+        {"구분": "Lens", "카테고리": "렌즈", "브랜드": "Tamron", "모델명": "T 28-75", "규격": "FF", "상태": "대여가능"},
+    ])
+    today = date.today().isoformat()
+    for i, status in enumerate(("대기", "확정", "반납완료"), 1):
+        store.insert_rental({
+            "신청자": f"u{i}", "연락처": "010", "장비명": "[EOS RP] + [RF 50mm]", "body_id": 1, "lens_id": 2,
+            "대여시작일": today, "반납예정일": today, "대면시간": "", "담당자": "미지정", "상태": status,
+            "비고": "", "실제반납일": "", "액세서리": "없음", "추가요청": "없음", "신청일시": today,
+        })
+    db.use_store(store)
+    yield AppTest.from_file(APP, default_timeout=60)
+    db.use_store(None)
+    store.conn.close()
+
+
+def _backend_calls() -> int:
+    return db.get_io_stats()["backend_calls"]
+
+
+def _assert_warm_reruns_skip_backend(at: AppTest, reruns: int = 3):
+    at.run()  # 워밍 (스냅샷·조회 캐시 채움)
+    assert not at.exception
+    before = _backend_calls()
+    for _ in range(reruns):
+        at.run()
+        assert not at.exception
+    assert _backend_calls() == before
+
+
+def test_member_page_rerun_has_no_backend_calls(app):
+    app.run()
+    _assert_warm_reruns_skip_backend(app)
+
+
+def test_admin_page_rerun_has_no_backend_calls(app):
+    app.run()
+    app.sidebar.selectbox[1].set_value("🛠️ 집행부 전용 관리").run()
+    app.text_input[0].input("1111").run()
+    next(b for b in app.button if b.label == "로그인").click().run()
+    assert app.session_state.auth
+    app.session_state["admin_tab"] = "승인 대기"
+    _assert_warm_reruns_skip_backend(app)
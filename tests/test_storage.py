@@ -0,0 +1,35 @@
+import pytest
+
+from storage import RentalStore, SQLiteStore
+
+
+@pytest.fixture
+def store():
+    store = SQLiteStore(":memory:")
+    store.insert_inventory([
+        {"구분": "Body", "카테고리": "미러리스", "브랜드": "Canon", "모델명": "EOS RP", "규격": "FF", "상태": "대여가능"},
+        {"구분": "Lens", "카테고리": "렌즈", "브랜드": "Canon", "모델명": "RF 50mm", "규격": "FF", "상태": "대여가능"},
+    ])
+    store.insert_rental({"신청자": "u1", "장비명": "[EOS RP] + [RF 50mm]", "대여시작일": "2026-03-02",
+                         "반납예정일": "2026-03-04", "상태": "대기", "body_id": 1, "lens_id": 2})
+    yield store
+    store.conn.close()
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RentalStore()
+
+
+def test_upsert_inventory_updates_in_place(store):
+    store.upsert_inventory([{"id": 1, "상태": "수리중"}, {"id": 3, "구분": "Lens", "모델명": "T 28-75"}])
+    items = {r["id"]: r for r in store.fetch_inventory()}
+    assert items[1]["상태"] == "수리중" and items[1]["모델명"] == "EOS RP"  # 주어지지 않은 컬럼은 유지
+    assert items[3]["모델명"] == "T 28-75"
+    assert store.fetch_rentals()[0]["body_id"] == 1  # 참조하던 대여 건이 그대로
+
+
+def test_delete_inventory_nulls_rental_references(store):
+    store.delete_inventory([2])
+    rental = store.fetch_rentals()[0]
+    assert (rental["body_id"], rental["lens_id"]) == (1, None)
@@ -0,0 +1,21 @@
+import threading
+import time
+
+import database as db
+
+
+def test_cold_load_survives_concurrent_patch():
+    """스냅샷이 없을 때 로드 도중 쓰기가 끼어들어도 기다리던 호출자는 데이터를 받아야 함"""
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"admin_password": "1111"}
+
+    cache = db._TableCache("Settings", slow_loader)
+    writer = threading.Timer(0.05, lambda: cache.patch(lambda data: data))
+    writer.start()
+    assert cache.get() == {"admin_password": "1111"}
+    writer.join()
+    assert len(calls) == 2  # 쓰기 이후 상태로 한 번 더 로드
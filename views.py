@@ -0,0 +1,355 @@
+import calendar
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from frames import to_records
+
+# ==========================================
+# [THEME] 테마별 CSS 번들 (모듈 로드 시 한 번만 생성)
+# ==========================================
+
+THEMES = {
+    "light": {
+        "bg": "#FFFFFF", "text": "#000000", "cont": "#FFFFFF", "input": "#FFFFFF", "brd": "#cccccc",
+        "cal_h": "#fdfdfd", "cal_d": "#FFFFFF", "cal_e": "#fdfdfd", "brand": "#B2DFDB", "btn_t": "#FFFFFF"
+    },
+    "dark": {
+        "bg": "#252526", "text": "#E0E0E0", "cont": "#2D2D2D", "input": "#3C3C3C", "brd": "#454545",
+        "cal_h": "#333333", "cal_d": "#2D2D2D", "cal_e": "#252526", "brand": "#004246", "btn_t": "#FFFFFF"
+    }
+}
+
+
+def _make_vars(base):
+    return f"""
+        --bg-color: {base['bg']}; --text-color: {base['text']}; --container-bg: {base['cont']};
+        --input-bg: {base['input']}; --border-color: {base['brd']}; --calendar-header-bg: {base['cal_h']};
+        --calendar-day-bg: {base['cal_d']}; --calendar-empty-bg: {base['cal_e']};
+        --main-brand-color: {base['brand']}; --button-text: {base['btn_t']};
+    """
+
+
+def _build_theme_css() -> dict:
+    """테마 선택지별 <style> 블록을 미리 만들어 둡니다. style.css는 이때 한 번만 읽습니다."""
+    dark_extra = ".rental-line { border: 1px solid rgba(255,255,255,0.2); filter: saturate(1.2) brightness(1.1); } .calendar-day.empty { background-color: var(--calendar-empty-bg) !important; }"
+    dynamic = {
+        "시스템 설정": f":root {{ {_make_vars(THEMES['light'])} }} @media (prefers-color-scheme: dark) {{ :root {{ {_make_vars(THEMES['dark'])} }} {dark_extra} }}",
+        "라이트": f":root {{ {_make_vars(THEMES['light'])} }}",
+        "다크": f":root {{ {_make_vars(THEMES['dark'])} }} {dark_extra}",
+    }
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style.css'), encoding='utf-8') as f:
+            base_css = f.read()
+    except OSError:
+        return {}
+    return {mode: f"<style>{base_css}{css}</style>" for mode, css in dynamic.items()}
+
+
+THEME_CSS = _build_theme_css()
+
+# ==========================================
+# [CALENDAR] 대여 현황 캘린더 렌더링 엔진
+# ==========================================
+
+CALENDAR_STATUSES = ["확정", "대여중"]
+CALENDAR_COLORS = ["#FF5252", "#448AFF", "#4CAF50", "#FFC107", "#9C27B0", "#00BCD4", "#E91E63"]
+WEEKDAY_LABELS = ["일", "월", "화", "수", "목", "금", "토"]
+MAX_LINES_PER_DAY = 3
+# 클라이언트로 한 번에 보내는 월 범위 (보이는 달 기준 -3 ~ +6개월) 및 미리 받아 둘 가장자리 폭
+CALENDAR_WINDOW = (-3, 6)
+CALENDAR_PREFETCH_MARGIN = 2
+
+
+def _month_buckets(rentals: pd.DataFrame, view_year: int, view_month: int):
+    """
+    보이는 달의 활성 대여 건을 날짜별 버킷으로 한 번에 전개합니다.
+    반환값: (활성 대여 DataFrame, 날짜별 전체 건수 배열, 날짜별 표시 대상 행 위치 리스트)
+    """
+    n_days = calendar.monthrange(view_year, view_month)[1]
+    counts = np.zeros(n_days, dtype=np.int64)
+    shown = [[] for _ in range(n_days)]
+    if rentals is None or rentals.empty or "상태" not in rentals.columns:
+        return None, counts, shown
+
+    active = rentals[rentals["상태"].isin(CALENDAR_STATUSES)]
+    if active.empty:
+        return active, counts, shown
+
+    # 월 첫날 기준 일 오프셋으로 변환 후 보이는 달 범위로 잘라냄 (날짜 컬럼은 로드 시 datetime64로 변환됨)
+    first = pd.Timestamp(view_year, view_month, 1)
+    s_off = (active["대여시작일"].dt.normalize() - first).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    e_off = (active["반납예정일"].dt.normalize() - first).dt.days.to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(s_off) & ~np.isnan(e_off) & (s_off <= e_off) & (e_off >= 0) & (s_off < n_days)
+    if not valid.any():
+        return active, counts, shown
+
+    rows = np.flatnonzero(valid)
+    lo = np.clip(s_off[valid], 0, None).astype(np.int64)
+    hi = np.clip(e_off[valid], None, n_days - 1).astype(np.int64)
+    lengths = hi - lo + 1
+
+    # (행, 날짜) 쌍 전개: 각 대여 건을 겹치는 날짜 수만큼 반복
+    total = int(lengths.sum())
+    group_offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days = np.repeat(lo, lengths) + (np.arange(total) - group_offsets)
+    row_pos = np.repeat(rows, lengths)
+    counts = np.bincount(days, minlength=n_days)
+
+    # 날짜별로 원래 행 순서를 유지하며 앞의 3건만 남김
+    order = np.lexsort((row_pos, days))
+    days, row_pos = days[order], row_pos[order]
+    rank = np.arange(total) - np.searchsorted(days, days, side="left")
+    keep = rank < MAX_LINES_PER_DAY
+    for d, r in zip(days[keep].tolist(), row_pos[keep].tolist()):
+        shown[d].append(r)
+    return active, counts, shown
+
+
+def _tooltip(r: dict, is_admin: bool) -> str:
+    acc = r.get('액세서리', '없음')
+    rem_info = f" | 비고: {r['비고']}" if is_admin and r.get('비고') else ""
+    return f"{r['신청자']} / {r['장비명']} / 액세서리: {acc}{rem_info}"
+
+
+def month_index(year: int, month: int) -> int:
+    """(연, 월)을 연속된 월 번호로 변환합니다. (월 이동 계산용)"""
+    return year * 12 + month - 1
+
+
+def month_at(index: int) -> tuple:
+    year, month0 = divmod(index, 12)
+    return year, month0 + 1
+
+
+def calendar_window(view_year: int, view_month: int) -> tuple:
+    """보이는 달 기준 CALENDAR_WINDOW 범위의 (첫날, 마지막 날)"""
+    start = month_at(month_index(view_year, view_month) + CALENDAR_WINDOW[0])
+    end = month_at(month_index(view_year, view_month) + CALENDAR_WINDOW[1])
+    return date(*start, 1), date(*end, calendar.monthrange(*end)[1])
+
+
+def month_payload(rentals, view_year, view_month, is_admin=False) -> dict:
+    """
+    한 달치 캘린더 데이터. 대여가 있는 날짜만 {일: [툴팁 목록(최대 3건), 초과 건수]}로 담습니다.
+    lead는 1일 앞의 빈 칸 수(일요일 시작), n은 그 달의 일수입니다.
+    """
+    active, counts, shown = _month_buckets(rentals, view_year, view_month)
+
+    # 실제로 표시되는 행(최대 3건 x 일수)만 레코드로 변환
+    needed = sorted({r for rows in shown for r in rows})
+    records = dict(zip(needed, to_records(active.iloc[needed]))) if needed else {}
+
+    days = {}
+    for day, rows in enumerate(shown, start=1):
+        if rows:
+            days[day] = [[_tooltip(records[pos], is_admin) for pos in rows], max(0, int(counts[day - 1]) - MAX_LINES_PER_DAY)]
+    return {
+        "y": view_year, "m": view_month, "n": len(shown), "days": days,
+        "lead": (calendar.weekday(view_year, view_month, 1) + 1) % 7,
+    }
+
+
+def calendar_payload(rentals, view_year, view_month, is_admin=False, today=None) -> dict:
+    """보이는 달 기준 CALENDAR_WINDOW 범위의 월별 캘린더 데이터를 클라이언트 컴포넌트용으로 묶습니다."""
+    today = today or date.today()
+    center = month_index(view_year, view_month)
+    if rentals is not None and not rentals.empty and {"상태", "대여시작일", "반납예정일"}.issubset(rentals.columns):
+        # 창과 겹치는 활성 건만 남겨 월별 전개 비용을 줄임
+        first, last = (pd.Timestamp(d) for d in calendar_window(view_year, view_month))
+        rentals = rentals[rentals["상태"].isin(CALENDAR_STATUSES)
+                          & (rentals["반납예정일"] >= first) & (rentals["대여시작일"] <= last)]
+    months = [month_payload(rentals, *month_at(center + k), is_admin)
+              for k in range(CALENDAR_WINDOW[0], CALENDAR_WINDOW[1] + 1)]
+    return {
+        "months": months, "view": center, "margin": CALENDAR_PREFETCH_MARGIN,
+        "today": [today.year, today.month, today.day], "colors": CALENDAR_COLORS, "weekdays": WEEKDAY_LABELS,
+    }
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _cached_calendar_payload(view_year, view_month, is_admin, version, today, _rentals):
+    """(연, 월, 관리자 여부, 대여 데이터 버전, 오늘 날짜) 단위로 완성된 payload를 캐싱합니다."""
+    return calendar_payload(_rentals, view_year, view_month, is_admin, today)
+
+
+def get_calendar_payload(rentals, view_year, view_month, is_admin=False, version=None) -> dict:
+    """
+    대여 현황 캘린더 payload를 반환합니다.
+    version(대여 데이터 버전)이 주어지면 결과를 캐싱해 같은 창을 다시 요청할 때 재계산하지 않습니다.
+    """
+    if version is None:
+        return calendar_payload(rentals, view_year, view_month, is_admin)
+    return _cached_calendar_payload(view_year, view_month, is_admin, version, date.today(), rentals)
+
+
+def _load_calendar_js() -> str:
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calendar.js'), encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+_CALENDAR_JS = _load_calendar_js()
+
+
+def render_calendar(payload: dict, key: str, on_view_change=None):
+    """
+    캘린더 컴포넌트를 그립니다. 창 안의 월 이동·툴팁은 브라우저에서 처리되며,
+    사용자가 창 가장자리에 가까워질 때만 view(월 번호) 상태가 갱신되어 on_view_change가 호출됩니다.
+    """
+    # 컴포넌트 등록은 Streamlit 런타임 단위로 유지되므로 그릴 때마다 같은 정의로 등록 (동일 정의 재등록은 비용 없음)
+    # 테마 CSS(style.css)의 캘린더 클래스를 그대로 쓰도록 스타일 격리 없이 등록
+    component = st.components.v2.component("rental_calendar", js=_CALENDAR_JS, isolate_styles=False)
+    return component(key=key, data=payload, on_view_change=on_view_change or (lambda: None))
+
+
+# ==========================================
+# [RENTAL FORM] 신청 양식용 장비 필터링
+# ==========================================
+
+def display_name(brand, model) -> str:
+    """선택 목록에 표시되는 '[브랜드] 모델명' 문자열"""
+    return f"[{brand}] {model}"
+
+
+def normalize_category(category) -> str:
+    """카테고리 표기 통일 ('DSLR(크롭)' → 'DSLR (크롭)')"""
+    return str(category).replace("DSLR(크롭)", "DSLR (크롭)")
+
+
+def compatible_brands(brand) -> set:
+    """바디 브랜드와 호환되는 렌즈 브랜드 (Canon 바디는 Tamron 렌즈도 허용)"""
+    brand = str(brand).strip()
+    return {brand, "Tamron"} if brand == "Canon" else {brand}
+
+
+class CompatIndex:
+    """
+    장비 스냅샷 한 버전에 대한 카테고리 → 바디 → 호환 렌즈 색인. (키는 장비 id)
+    - 렌즈는 '대여가능' 상태만 포함
+    - 브랜드 일치 (Canon 바디는 Tamron 렌즈도 허용), FF 바디는 FF 렌즈만 허용
+    신청 양식은 이 색인의 딕셔너리 조회만으로 선택 목록을 구성합니다.
+    """
+
+    def __init__(self, inv: pd.DataFrame):
+        self.items = {}              # id -> {"brand", "model", "spec", "label"}
+        self.bodies_by_category = {} # 카테고리 -> [바디 id]
+        self.lenses = []             # 대여 가능한 렌즈 id 전체
+        self.lenses_for_body = {}    # 바디 id -> [호환 렌즈 id]
+        self.ff_only = set()         # FF 렌즈만 허용되는 바디 id
+        if inv is None or inv.empty:
+            self.categories = []
+            return
+
+        ids = inv['id'].tolist() if 'id' in inv.columns else inv.index.tolist()
+        lens_groups = {}  # (브랜드, FF 여부) -> [렌즈 id]
+        for item_id, kind, cat, brand, model, spec, status in zip(
+                ids, inv['구분'], inv['카테고리'], inv['브랜드'], inv['모델명'], inv['규격'], inv['상태']):
+            self.items[item_id] = {"brand": brand, "model": model, "spec": spec, "label": display_name(brand, model)}
+            if kind == 'Body':
+                self.bodies_by_category.setdefault(normalize_category(cat), []).append(item_id)
+            elif kind == 'Lens' and status == '대여가능':
+                self.lenses.append(item_id)
+                lens_groups.setdefault((str(brand).strip(), spec == "FF"), []).append(item_id)
+
+        self.categories = sorted(self.bodies_by_category)
+        order = {lens_id: i for i, lens_id in enumerate(self.lenses)}
+        for body_ids in self.bodies_by_category.values():
+            for body_id in body_ids:
+                body = self.items[body_id]
+                ff = str(body["spec"]).strip() == "FF"
+                if ff:
+                    self.ff_only.add(body_id)
+                matched = [
+                    lens_id
+                    for (brand, is_ff), group in lens_groups.items()
+                    if brand in compatible_brands(body["brand"]) and (is_ff or not ff)
+                    for lens_id in group
+                ]
+                self.lenses_for_body[body_id] = sorted(matched, key=order.get)
+
+    def label(self, item_id) -> str:
+        return self.items[item_id]["label"]
+
+    def model(self, item_id) -> str:
+        return self.items[item_id]["model"]
+
+    def bodies(self, category) -> list:
+        return self.bodies_by_category.get(category, [])
+
+    def lenses_for(self, body_id=None) -> list:
+        """바디와 호환되는 렌즈 id 목록 (바디 미선택 시 대여 가능한 렌즈 전체)"""
+        return self.lenses if body_id is None else self.lenses_for_body.get(body_id, [])
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_compat_index(version, _inv) -> CompatIndex:
+    """장비 데이터 버전별로 호환성 색인을 한 번만 구성해 모든 세션이 공유합니다."""
+    return CompatIndex(_inv)
+
+
+def window_label(window) -> str:
+    """(시작일, 반납일) → 'MM/DD ~ MM/DD'"""
+    start, end = window
+    return f"{start:%m/%d} ~ {end:%m/%d}"
+
+
+def availability_table(windows: dict, compat: CompatIndex, body_ids, lens_ids, start_date) -> pd.DataFrame:
+    """
+    장비별 가장 빠른 대여 가능 일정(db.find_available_windows 결과)을 신청 양식 안내 표로 정리합니다.
+    요청 기간에 바로 빌릴 수 있는 장비를 먼저, 나머지는 가능 일정이 빠른 순으로 나열합니다.
+    """
+    rows = [
+        {"구분": kind, "장비": compat.label(item_id), "요청 기간": "가능" if windows[item_id][0] == start_date else "불가",
+         "가장 빠른 일정": window_label(windows[item_id]), "_start": windows[item_id][0]}
+        for kind, ids in (("바디", body_ids), ("렌즈", lens_ids))
+        for item_id in ids if item_id in windows
+    ]
+    if not rows:
+        return pd.DataFrame(columns=["구분", "장비", "요청 기간", "가장 빠른 일정"])
+    frame = pd.DataFrame(rows)
+    return frame.sort_values("_start", kind="stable", ignore_index=True).drop(columns="_start")
+
+
+# ==========================================
+# [ADMIN] 관리 탭 데이터 준비
+# ==========================================
+
+def d_day_label(diff: int) -> str:
+    """반납까지 남은 일수를 D-n / D-day / D+n 형식으로 표시"""
+    return f"D-{diff}" if diff > 0 else ("D-day" if diff == 0 else f"D+{abs(diff)}")
+
+
+def prepare_ongoing(ongoing: pd.DataFrame, today=None) -> pd.DataFrame:
+    """진행 중 대여 목록에 반납까지 남은 일수(d_diff)와 D-day 표기(d_day)를 한 번에 계산해 붙입니다."""
+    today = pd.Timestamp(today or date.today())
+    diff = (ongoing['반납예정일'].dt.normalize() - today).dt.days
+    return ongoing.assign(d_diff=diff, d_day=[d_day_label(int(d)) if pd.notna(d) else "-" for d in diff])
+
+
+# 관리 탭 목록의 페이지당 표시 건수
+QUEUE_PAGE_SIZE = 10
+HISTORY_PAGE_SIZE = 50
+
+# 대여 이력 표의 날짜 컬럼 표시 형식 (스냅샷은 datetime64로 보관)
+RENTAL_COLUMN_CONFIG = {
+    "대여시작일": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "반납예정일": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "실제반납일": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+    "신청일시": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+}
+
+
+def page_count(total: int, page_size: int) -> int:
+    return max(1, -(-int(total) // page_size))
+
+
+def paginate(frame: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """1부터 시작하는 page 번호의 행만 잘라 반환합니다. (범위를 벗어나면 마지막 페이지)"""
+    page = min(max(1, int(page)), page_count(len(frame), page_size))
+    return frame.iloc[(page - 1) * page_size: page * page_size]